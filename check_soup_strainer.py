@@ -0,0 +1,59 @@
+# check_soup_strainer.py
+# Compares what the remaining bs4 readers in scrapeDokkanInfoBS4 see through the strained soup (_soup)
+# against a full BeautifulSoup(html, "lxml") parse, for the sample card and a few page-shape variants.
+# Usage: python check_soup_strainer.py [card.html ...]   (exit code 1 on any difference)
+import sys
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+import scrapeDokkanInfoBS4 as S
+
+SAMPLE = Path(__file__).resolve().parent / "fixtures" / "sample_card.html"
+
+def page_variants(html: str):
+    """The page as-is, plus the shapes the strainer has to cope with: body-level text and script/style/svg
+    blobs, an app root wrapper, and content nested under tags the strainer doesn't list."""
+    head, sep, body = html.partition("<body>")
+    if not sep:
+        yield "as-is", html
+        return
+    body, _, tail = body.rpartition("</body>")
+    yield "as-is", html
+    yield "body-level blobs", (head + "<body>Bare body text<script>var x = '<th>EZA</th>';</script>"
+                               "<style>h1 { color: red }</style><svg><text>svgtext</text></svg>"
+                               + body + "<strong>tail</strong></body>" + tail)
+    yield "app root", head + '<body><div id="app">' + body + "</div></body>" + tail
+    yield "main wrapper", head + "<body><main><section>" + body + "</section></main></body>" + tail
+
+def readers(soup: BeautifulSoup) -> dict:
+    h1 = soup.select_one("h1")
+    return {
+        "stats": S._parse_stats_table_dom(soup),
+        "type_token": S.detect_type_token_from_dom(soup),
+        "eza_dropdown": S.has_eza_dropdown(soup),
+        "eza_toggle": S.has_eza_toggle(soup),
+        "eza_stats_headers": S.has_eza_stats_headers(soup),
+        "eza_steps": S.discover_eza_steps_on_page_soup(soup, "UR"),
+        "h1": h1.get_text(strip=True) if h1 else None,
+        "title": soup.title.string.strip() if (soup.title and soup.title.string) else None,
+    }
+
+def check(path: Path) -> int:
+    html = path.read_text(encoding="utf-8")
+    bad = 0
+    for name, page in page_variants(html):
+        strained, full = readers(S._soup(page)), readers(BeautifulSoup(page, "lxml"))
+        diffs = [k for k in full if strained[k] != full[k]]
+        if diffs:
+            bad += 1
+            print("[DIFF]", path.name, name)
+            for k in diffs:
+                print("   ", k, "strained:", strained[k], "full:", full[k])
+        else:
+            print("[OK]", path.name, name)
+    return bad
+
+if __name__ == "__main__":
+    paths = [Path(p) for p in sys.argv[1:]] or [SAMPLE]
+    sys.exit(1 if sum(check(p) for p in paths) else 0)
@@ -2,36 +2,66 @@
 # DokkanInfo scraper (text-driven parsing + robust DOM strategies for Categories)
 # Python 3.9 compatible
 
+import argparse
+import asyncio
+import atexit
+import hashlib
 import json
 import logging
+import logging.handlers
+import os
+import queue
 import re
+import shutil
+import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
 
 # ------------ Config -------------
 BASE = "https://dokkaninfo.com"
 INDEX_URL = f"{BASE}/cards?sort=open_at"
 OUTROOT = Path("output/cards")
 LOGDIR = Path("output/logs")
+CARD_CACHE_DB = OUTROOT / "_cache.sqlite"    # url -> METADATA.json of cards already scraped
+BLOB_DIR = Path("output/_blobs")          # sha1-named asset bytes, hardlinked into card folders
+BLOB_INDEX_PATH = BLOB_DIR / "index.json"  # url -> {sha1, etag, size}
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/124.0.0.0 Safari/537.36"
 )
 HEADERS_DL = {"User-Agent": USER_AGENT, "Referer": BASE}
-TIMEOUT = 60_000
+TIMEOUT = 15_000
+SELECTOR_TIMEOUT = 10_000
 LIMIT_CARDS = 2
 SLEEP_BETWEEN_CARDS = 0
+MAX_CONCURRENCY = 5     # cards scraped in parallel (one tab each)
+ASSET_WORKERS = 16      # image downloads in flight across all cards
+ASSET_READ_CHUNK = 1 << 18    # 256 KiB per read off the socket
+ASSET_WRITE_BUFFER = 1 << 19  # 512 KiB userspace buffer before each write()
 
 HEADLESS = False
-SLOW_MO_MS = 200
-ENABLE_TRACE = True
+VIEWPORT = {"width": 1400, "height": 900}
+SLOW_MO_MS = 0          # bump (e.g. 200) when watching the browser while debugging
+# Diagnostics are opt-in: SCRAPER_TRACE=1 / SCRAPER_SCREENSHOTS=1
+ENABLE_TRACE = os.environ.get("SCRAPER_TRACE") == "1"
+ENABLE_SCREENSHOTS = os.environ.get("SCRAPER_SCREENSHOTS") == "1"
+SAVE_PAGE_HTML = True   # raw page.html per card; parsing only needs the body text
 
 HEADERS = [
     "Leader Skill",
@@ -44,6 +74,7 @@ HEADERS = [
     "Categories",
     "Stats",
 ]
+HEADERS_SET = frozenset(HEADERS)
 
 CATEGORY_BLACKLIST_TOKENS = {
     "background", "icon", "rarity", "element", "eza", "undefined",
@@ -51,6 +82,54 @@ CATEGORY_BLACKLIST_TOKENS = {
 }
 EXT_FILE_PATTERN = re.compile(r"\.(png|jpg|jpeg|gif|webp)$", re.IGNORECASE)
 
+# Parser patterns (compiled once; these run per line on every card)
+WS_RE = re.compile(r"\s+")
+SEMI_RE = re.compile(r"\s*;\s*")
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.])\s+')
+EXPLODING_RAGE_DUP_RE = re.compile(
+    r'("Exploding Rage"\s*Category\s+Ki\s*\+\d+\s+and\s+HP,\s*ATK\s*&\s*DEF\s*\+\d+%)\s*\1',
+    re.IGNORECASE,
+)
+PCT_ONLY_RE = re.compile(r"\d+\s*%$")
+SA_LV_RE = re.compile(r"\bSA\s*Lv\b", re.IGNORECASE)
+RAISES_CAUSES_RE = re.compile(r"\s*Raises ATK & DEF\s*Causes", re.IGNORECASE)
+BASIC_EFFECT_RE = re.compile(r"Basic effect\(s\)", re.IGNORECASE)
+BASIC_EFFECT_COLON_RE = re.compile(r"^(Basic effect\(s\))\s*:?(\s*)", re.IGNORECASE)
+FOR_EVERY_COLON_RE = re.compile(r"^(For every [^.]+?)(?!:)\s", re.IGNORECASE)
+LINK_SKILLS_RE = re.compile(r"Link Skills", re.IGNORECASE)
+NUM_ONLY_RE = re.compile(r"[\d\s%:]+")
+# Cost / Max Lv / SA Lv / Release Date in one scan over the page text
+PAGE_FIELDS_RE = re.compile(
+    r"\bCost\s*:\s*(?P<cost>\d+)"
+    r"|\bMax\s*Lv\s*:\s*(?P<max_lv>\d+)"
+    r"|\bSA\s*Lv\s*:\s*(?P<sa_lv>\d+)"
+    r"|Release Date\s+(?P<date>[0-9/.\-]+)\s+(?P<time>[0-9: ]+[APMapm]{2})\s+(?P<tz>[A-Z]{2,4})",
+    re.IGNORECASE,
+)
+STATS_ROW_RES = {
+    key: re.compile(rf"^{key}\s+([0-9,]+)\s+([0-9,]+)\s+([0-9,]+)\s+([0-9,]+)$", re.IGNORECASE)
+    for key in ("HP", "ATK", "DEF")
+}
+SUPER_FALLBACK_RE = re.compile(r"Super Attack\s+([\s\S]*?)\s+Ultra Super Attack", re.IGNORECASE)
+ULTRA_FALLBACK_RE = re.compile(
+    r"Ultra Super Attack\s+([\s\S]*?)\s+(Passive Skill|Active Skill|Link Skills|Categories|Stats)",
+    re.IGNORECASE,
+)
+LEADING_PATTERNS = [
+    r"^Activates the Entrance Animation",
+    r"^Ki \+\d",
+    r"^ATK",
+    r"^DEF",
+    r"^Guards all attacks",
+    r"^For every attack performed",
+    r"^For every attack received",
+    r"^Launches an additional attack",
+    r"^For every Super Attack the enemy launches",
+    r"^When receiving an Unarmed Super Attack",
+    r"^Basic effect\(s\):",
+]
+LEADING_RE = re.compile("|".join(f"(?:{p})" for p in LEADING_PATTERNS), re.IGNORECASE)
+
 # ------------ Logging -------------
 def setup_logging() -> Path:
     LOGDIR.mkdir(parents=True, exist_ok=True)
@@ -60,9 +139,12 @@ def setup_logging() -> Path:
     logger = logging.getLogger()
     logger.setLevel(logging.DEBUG)
 
-    fh = logging.FileHandler(log_path, encoding="utf-8")
+    fh = logging.FileHandler(log_path, encoding="utf-8", delay=True)
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    # Batch file writes; anything WARNING and up still goes out immediately.
+    mh = logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.WARNING, target=fh)
+    mh.setLevel(logging.DEBUG)
 
     ch = logging.StreamHandler()
     ch.setLevel(logging.INFO)
@@ -71,87 +153,230 @@ def setup_logging() -> Path:
     for h in list(logger.handlers):
         logger.removeHandler(h)
 
-    logger.addHandler(fh)
-    logger.addHandler(ch)
+    # Scraping threads and the event loop only enqueue; a listener thread does the I/O.
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(q))
+    listener = logging.handlers.QueueListener(q, mh, ch, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
 
     logging.info("Logging to %s", log_path)
     return log_path
 
 # ------------ Helpers -------------
+SANITIZE_TABLE = str.maketrans({
+    ":": " -", "/": "-", "\\": "-", "|": "-", "*": "x", "?": "", '"': "'",
+})
+
 def sanitize_filename(name: str) -> str:
-    name = (
-        name.replace(":", " -")
-        .replace("/", "-")
-        .replace("\\", "-")
-        .replace("|", "-")
-        .replace("*", "x")
-        .replace("?", "")
-        .replace('"', "'")
-        .strip()
-    )
-    name = re.sub(r"\s+", " ", name)
+    name = name.translate(SANITIZE_TABLE).strip()
+    name = WS_RE.sub(" ", name)
     return name.rstrip(" .")
 
+RARITY_RE = re.compile(
+    r"(?P<LR>cha_rare_sm_lr|cha_rare_lr|/lr\.)"
+    r"|(?P<UR>cha_rare_sm_ur|cha_rare_ur)"
+    r"|(?P<SSR>cha_rare_sm_ssr|cha_rare_ssr)"
+    r"|(?P<SR>cha_rare_sm_sr|cha_rare_sr)"
+    r"|(?P<R>cha_rare_sm_r|cha_rare_r)"
+    r"|(?P<N>cha_rare_sm_n|cha_rare_n)",
+    re.IGNORECASE,
+)
+
 def detect_rarity_and_type_from_images(image_urls: List[str]) -> Tuple[Optional[str], Optional[str]]:
     rarity = None
-    patterns = {
-        "LR": ["cha_rare_sm_lr", "cha_rare_lr", "/lr."],
-        "UR": ["cha_rare_sm_ur", "cha_rare_ur"],
-        "SSR": ["cha_rare_sm_ssr", "cha_rare_ssr"],
-        "SR": ["cha_rare_sm_sr", "cha_rare_sr"],
-        "R": ["cha_rare_sm_r", "cha_rare_r"],
-        "N": ["cha_rare_sm_n", "cha_rare_n"],
-    }
-    for url in image_urls:
-        low = url.lower()
-        for label, needles in patterns.items():
-            if any(n in low for n in needles):
-                rarity = label
-                break
-        if rarity:
-            break
-
     type_icon = None
     for url in image_urls:
-        if "cha_type_icon_" in url:
+        if rarity is None:
+            m = RARITY_RE.search(url)
+            if m:
+                rarity = m.lastgroup
+        if type_icon is None and "cha_type_icon_" in url:
             type_icon = Path(urlparse(url).path).name
+        if rarity and type_icon:
             break
 
     logging.debug("Rarity detected: %s, type icon: %s", rarity, type_icon)
     return rarity, type_icon
 
-def download_assets(urls: List[str], dest_dir: Path) -> List[str]:
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    saved: List[str] = []
-    for url in urls:
+def dump_json_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically write `data` to `path` unless a `.sha` sidecar says the bytes are unchanged."""
+    digest = hashlib.blake2b(data).digest()
+    sha_path = path.with_name(path.name + ".sha")
+    try:
+        if sha_path.read_bytes() == digest and path.exists():
+            return False
+    except FileNotFoundError:
+        pass
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    sha_path.write_bytes(digest)
+    return True
+
+def open_card_cache() -> sqlite3.Connection:
+    conn = sqlite3.connect(str(CARD_CACHE_DB))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "url TEXT PRIMARY KEY, release_date TEXT, meta_path TEXT, scraped_at REAL)"
+    )
+    return conn
+
+def is_card_cached(cache: sqlite3.Connection, url: str) -> bool:
+    row = cache.execute("SELECT meta_path FROM cache WHERE url = ?", (url,)).fetchone()
+    return bool(row and row[0] and Path(row[0]).exists())
+
+def record_card(cache: sqlite3.Connection, url: str, release_date: Optional[str], meta_path: Path) -> None:
+    cache.execute(
+        "INSERT OR REPLACE INTO cache (url, release_date, meta_path, scraped_at) VALUES (?, ?, ?, ?)",
+        (url, release_date, str(meta_path), time.time()),
+    )
+    cache.commit()
+
+# Shared by every card; threads spin up lazily on first use.
+ASSET_POOL = ThreadPoolExecutor(max_workers=ASSET_WORKERS, thread_name_prefix="asset-dl")
+
+def build_session() -> requests.Session:
+    """One keep-alive session for the whole run so asset fetches reuse pooled connections."""
+    sess = requests.Session()
+    sess.headers.update(HEADERS_DL)
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    )
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    return sess
+
+def _nonempty(path: Path) -> bool:
+    # One stat() instead of exists() + stat(); adds up when resuming over thousands of files.
+    try:
+        return path.stat().st_size > 0
+    except FileNotFoundError:
+        return False
+
+def load_blob_index() -> Dict[str, Dict]:
+    try:
+        return json.loads(BLOB_INDEX_PATH.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_blob_index(blob_index: Dict[str, Dict]) -> None:
+    tmp = BLOB_INDEX_PATH.with_name(BLOB_INDEX_PATH.name + ".tmp")
+    tmp.write_bytes(dump_json_bytes(dict(blob_index)))
+    os.replace(tmp, BLOB_INDEX_PATH)
+
+def _fetch_to_cache(
+    session: requests.Session, url: str, downloaded: Dict[str, Path], blob_index: Dict[str, Dict]
+) -> Path:
+    """Return the blob holding `url`, fetching only when this run hasn't already checked it.
+
+    Blobs are named by the sha1 of their bytes, so identical sprites served from
+    different URLs share one file. Entries from earlier runs are revalidated with
+    their stored ETag (a 304 reuses the blob); entries without one are trusted as-is.
+    """
+    blob = downloaded.get(url)
+    if blob is not None:
+        return blob
+
+    entry = blob_index.get(url)
+    known = BLOB_DIR / entry["sha1"] if entry else None
+    headers = {}
+    if known is not None and _nonempty(known):
+        if not entry.get("etag"):
+            downloaded[url] = known
+            return known
+        headers["If-None-Match"] = entry["etag"]
+
+    with session.get(url, stream=True, timeout=30, headers=headers) as r:
+        if r.status_code == 304:
+            downloaded[url] = known
+            return known
+        r.raise_for_status()
+        r.raw.decode_content = True
+        # Two cards can share a sprite and fetch it at the same moment; write to a
+        # per-thread temp name and move it into place once the digest is known.
+        tmp = BLOB_DIR / f"{threading.get_ident()}.part"
+        sha1 = hashlib.sha1()
+        size = 0
+        with open(tmp, "wb", buffering=ASSET_WRITE_BUFFER) as f:
+            for chunk in iter(lambda: r.raw.read(ASSET_READ_CHUNK), b""):
+                sha1.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        etag = r.headers.get("ETag")
+
+    digest = sha1.hexdigest()
+    blob = BLOB_DIR / digest
+    os.replace(tmp, blob)
+    blob_index[url] = {"sha1": digest, "etag": etag, "size": size}
+    downloaded[url] = blob
+    return blob
+
+def _asset_target(url: str, dest_dir: Path) -> Path:
+    *parts, name = urlparse(url).path.split("/")
+    return dest_dir.joinpath(*[p for p in parts if p], name)
+
+def _download_one(
+    session: requests.Session, url: str, target: Path, downloaded: Dict[str, Path], blob_index: Dict[str, Dict]
+) -> Optional[str]:
+    try:
         try:
-            parsed = urlparse(url)
-            path = Path(parsed.path)
-            subdir = dest_dir / Path(*[p for p in path.parts[:-1] if p not in ("/", "")])
-            subdir.mkdir(parents=True, exist_ok=True)
-            target = subdir / path.name
-
-            if target.exists() and target.stat().st_size > 0:
-                saved.append(str(target))
-                continue
-
-            with requests.get(url, headers=HEADERS_DL, stream=True, timeout=30) as r:
-                r.raise_for_status()
-                with open(target, "wb") as f:
-                    for chunk in r.iter_content(65536):
-                        if chunk:
-                            f.write(chunk)
-            saved.append(str(target))
-        except Exception as e:
-            logging.warning("Asset failed: %s -> %s", url, e)
-    return saved
+            st = target.stat()
+        except FileNotFoundError:
+            st = None
+        if st and st.st_size > 0:
+            return str(target)
+
+        cached = _fetch_to_cache(session, url, downloaded, blob_index)
+        try:
+            if st is not None:
+                target.unlink()
+            os.link(cached, target)
+        except OSError:
+            shutil.copyfile(cached, target)
+        return str(target)
+    except Exception as e:
+        logging.warning("Asset failed: %s -> %s", url, e)
+        return None
+
+async def download_assets(
+    session: requests.Session,
+    urls: List[str],
+    dest_dir: Path,
+    downloaded: Dict[str, Path],
+    blob_index: Dict[str, Dict],
+) -> List[str]:
+    """Fetch a card's images on ASSET_POOL; returns saved paths in input order.
+
+    `downloaded` maps URL -> blob checked this run and `blob_index` is the persisted
+    URL manifest; both are shared across cards, so sprites that appear on every card
+    are fetched at most once and hardlinked after that.
+    """
+    plan = [(url, _asset_target(url, dest_dir)) for url in urls]
+    # Create every subdir up front so worker threads never race on mkdir.
+    for subdir in {dest_dir} | {target.parent for _, target in plan}:
+        subdir.mkdir(parents=True, exist_ok=True)
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(ASSET_POOL, _download_one, session, url, target, downloaded, blob_index)
+        for url, target in plan
+    ))
+    return [r for r in results if r]
 
 # ------------ TEXT parsing -------------
 def _split_sections(page_text: str) -> Dict[str, List[str]]:
-    lines = [re.sub(r"\s+", " ", ln).strip() for ln in page_text.splitlines()]
+    lines = [WS_RE.sub(" ", ln).strip() for ln in page_text.splitlines()]
     indices: List[Tuple[str, int]] = []
     for idx, ln in enumerate(lines):
-        if ln in HEADERS:
+        if ln in HEADERS_SET:
             indices.append((ln, idx))
 
     sections: Dict[str, List[str]] = {}
@@ -164,14 +389,14 @@ def _split_sections(page_text: str) -> Dict[str, List[str]]:
     return sections
 
 def _condense_spaces(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip()
+    return WS_RE.sub(" ", s).strip()
 
 def _clean_leader(block: List[str]) -> Optional[str]:
     if not block:
         return None
     leader = block[0].strip()
     # Drop immediate duplication of an identical sentence
-    parts = [p.strip() for p in re.split(r'(?<=[.])\s+', leader) if p.strip()]
+    parts = [p.strip() for p in SENTENCE_SPLIT_RE.split(leader) if p.strip()]
     seen = set()
     dedup = []
     for p in parts:
@@ -180,12 +405,7 @@ def _clean_leader(block: List[str]) -> Optional[str]:
             dedup.append(p)
     leader = " ".join(dedup)
     # Specific common duplication on this site
-    leader = re.sub(
-        r'("Exploding Rage"\s*Category\s+Ki\s*\+\d+\s+and\s+HP,\s*ATK\s*&\s*DEF\s*\+\d+%)\s*\1',
-        r"\1",
-        leader,
-        flags=re.IGNORECASE,
-    )
+    leader = EXPLODING_RAGE_DUP_RE.sub(r"\1", leader)
     return leader
 
 def _clean_super_like(block: List[str]) -> Tuple[Optional[str], Optional[str]]:
@@ -197,14 +417,14 @@ def _clean_super_like(block: List[str]) -> Tuple[Optional[str], Optional[str]]:
     for ln in rest:
         if not ln:
             continue
-        if re.fullmatch(r"\d+\s*%$", ln):
+        if PCT_ONLY_RE.fullmatch(ln):
             continue
-        if re.search(r"\bSA\s*Lv\b", ln, flags=re.IGNORECASE):
+        if SA_LV_RE.search(ln):
             continue
         eff_parts.append(ln)
     eff = "; ".join(eff_parts)
-    eff = re.sub(r"\s*;\s*", "; ", eff)
-    eff = re.sub(r"\s*Raises ATK & DEF\s*Causes", " Raises ATK & DEF; Causes", eff, flags=re.IGNORECASE)
+    eff = SEMI_RE.sub("; ", eff)
+    eff = RAISES_CAUSES_RE.sub(" Raises ATK & DEF; Causes", eff)
     eff = _condense_spaces(eff)
     return (name or None), (eff or None)
 
@@ -212,33 +432,17 @@ def _group_passive_lines(lines: List[str]) -> str:
     if not lines:
         return ""
     # Remove headers if any snuck in
-    lines = [ln for ln in lines if ln not in HEADERS]
+    lines = [ln for ln in lines if ln not in HEADERS_SET]
     # Normalize "Basic effect(s)"
-    lines = [("Basic effect(s):" if re.fullmatch(r"Basic effect\(s\)", ln, flags=re.IGNORECASE) else ln) for ln in lines]
+    lines = [("Basic effect(s):" if BASIC_EFFECT_RE.fullmatch(ln) else ln) for ln in lines]
     # Ensure "Activates the Entrance Animation..." leads the effect block
     activ_idx = next((i for i, ln in enumerate(lines) if ln.lower().startswith("activates the entrance animation")), None)
     if activ_idx is not None and activ_idx != 0:
         first = lines.pop(activ_idx)
         lines.insert(0, first)
 
-    leading_patterns = [
-        r"^Activates the Entrance Animation",
-        r"^Ki \+\d",
-        r"^ATK",
-        r"^DEF",
-        r"^Guards all attacks",
-        r"^For every attack performed",
-        r"^For every attack received",
-        r"^Launches an additional attack",
-        r"^For every Super Attack the enemy launches",
-        r"^When receiving an Unarmed Super Attack",
-        r"^Basic effect\(s\):",
-    ]
     def is_leading(s: str) -> bool:
-        for pat in leading_patterns:
-            if re.search(pat, s, flags=re.IGNORECASE):
-                return True
-        return False
+        return LEADING_RE.search(s) is not None
 
     groups: List[List[str]] = []
     cur: List[str] = []
@@ -252,16 +456,16 @@ def _group_passive_lines(lines: List[str]) -> str:
 
     out_parts: List[str] = []
     for g in groups:
-        g = [x for x in g if x and x not in HEADERS]
+        g = [x for x in g if x and x not in HEADERS_SET]
         if not g: continue
         clause = " ".join(g)
         clause = _condense_spaces(clause)
-        clause = re.sub(r"^(Basic effect\(s\))\s*:?(\s*)", r"\1:\2", clause, flags=re.IGNORECASE)
-        clause = re.sub(r"^(For every [^.]+?)(?!:)\s", r"\1: ", clause, flags=re.IGNORECASE)
+        clause = BASIC_EFFECT_COLON_RE.sub(r"\1:\2", clause)
+        clause = FOR_EVERY_COLON_RE.sub(r"\1: ", clause)
         out_parts.append(clause)
 
     effect = "; ".join(out_parts)
-    effect = re.sub(r"\s*;\s*", "; ", effect)
+    effect = SEMI_RE.sub("; ", effect)
     return effect.strip()
 
 def _clean_active(block: List[str]) -> Tuple[Optional[str], Optional[str]]:
@@ -270,7 +474,7 @@ def _clean_active(block: List[str]) -> Tuple[Optional[str], Optional[str]]:
     name = block[0]
     body = []
     for ln in block[1:]:
-        if ln in HEADERS or re.fullmatch(r"Link Skills", ln, re.IGNORECASE):
+        if ln in HEADERS_SET or LINK_SKILLS_RE.fullmatch(ln):
             break
         body.append(ln)
     effect = "; ".join([_condense_spaces(b) for b in body if b])
@@ -287,26 +491,30 @@ def _clean_activation(block: List[str]) -> Optional[str]:
     return text.strip() or None
 
 def _clean_links(block: List[str]) -> List[str]:
-    out: List[str] = []
-    seen = set()
-    for ln in block or []:
-        s = _condense_spaces(ln)
-        if not s: continue
-        if s in seen: continue
-        seen.add(s); out.append(s)
-    return out
+    return list(dict.fromkeys(s for s in map(_condense_spaces, block or []) if s))
+
+def _scan_page_fields(page_text: str) -> Dict[str, str]:
+    """First occurrence of each PAGE_FIELDS_RE group, from a single pass over the text."""
+    fields: Dict[str, str] = {}
+    for m in PAGE_FIELDS_RE.finditer(page_text):
+        kind = m.lastgroup
+        if kind == "tz":
+            if "date" not in fields:
+                fields.update(date=m.group("date"), time=m.group("time"), tz=m.group("tz"))
+        elif kind not in fields:
+            fields[kind] = m.group(kind)
+        if len(fields) == 6:
+            break
+    return fields
 
-def _parse_stats(block: List[str], page_text: str) -> Dict[str, object]:
+def _parse_stats(block: List[str], fields: Dict[str, str]) -> Dict[str, object]:
     stats: Dict[str, object] = {}
-    m_cost = re.search(r"\bCost\s*:\s*(\d+)", page_text, flags=re.IGNORECASE)
-    if m_cost: stats["Cost"] = int(m_cost.group(1))
-    m_max = re.search(r"\bMax\s*Lv\s*:\s*(\d+)", page_text, flags=re.IGNORECASE)
-    if m_max: stats["Max Lv"] = int(m_max.group(1))
-    m_sa = re.search(r"\bSA\s*Lv\s*:\s*(\d+)", page_text, flags=re.IGNORECASE)
-    if m_sa: stats["SA Lv"] = int(m_sa.group(1))
+    if "cost" in fields: stats["Cost"] = int(fields["cost"])
+    if "max_lv" in fields: stats["Max Lv"] = int(fields["max_lv"])
+    if "sa_lv" in fields: stats["SA Lv"] = int(fields["sa_lv"])
 
     def parse_row(key: str) -> Optional[Dict[str, int]]:
-        pat = re.compile(rf"^{key}\s+([0-9,]+)\s+([0-9,]+)\s+([0-9,]+)\s+([0-9,]+)$", flags=re.IGNORECASE)
+        pat = STATS_ROW_RES[key]
         for ln in block:
             m = pat.match(ln)
             if m:
@@ -324,14 +532,9 @@ def _parse_stats(block: List[str], page_text: str) -> Dict[str, object]:
 
     return stats
 
-def _parse_release(page_text: str) -> Tuple[Optional[str], Optional[str]]:
-    m = re.search(
-        r"Release Date\s+([0-9/.\-]+)\s+([0-9: ]+[APMapm]{2})\s+([A-Z]{2,4})",
-        page_text,
-        flags=re.IGNORECASE,
-    )
-    if m:
-        return f"{m.group(1)} {m.group(2)}", m.group(3)
+def _parse_release(fields: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    if "date" in fields:
+        return f"{fields['date']} {fields['time']}", fields["tz"]
     return None, None
 
 def _clean_categories_python(cats: List[str]) -> List[str]:
@@ -343,41 +546,277 @@ def _clean_categories_python(cats: List[str]) -> List[str]:
         low = s.lower()
         if low in CATEGORY_BLACKLIST_TOKENS: continue
         if EXT_FILE_PATTERN.search(s): continue
-        if re.fullmatch(r"[\d\s%:]+", s): continue
-        if s in HEADERS or "Links:" in s or "Show More" in s: continue
+        if NUM_ONLY_RE.fullmatch(s): continue
+        if s in HEADERS_SET or "Links:" in s or "Show More" in s: continue
         if s in seen: continue
         seen.add(s); out.append(s)
     return out
 
 # ------------ Main -------------
-def main():
+# Everything process_card reads off a card page, gathered in a single evaluate call.
+COLLECT_PAGE_JS = """(HEADERS) => {
+    const altOrTitle = els => els.map(e => e.getAttribute("alt") || e.getAttribute("title") || "").filter(Boolean);
+    const categoriesBetweenHeaders = () => {
+        // Single TreeWalker pass: skip to the "Categories" header, collect until the next header.
+        const out = [];
+        const push = (v) => { if (v && String(v).trim()) out.push(String(v).trim()); };
+        const textOf = el => (el && (el.textContent || '').trim()) || '';
+        const headers = new Set(HEADERS);
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT);
+        let inside = false;
+        for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+          if (!inside) {
+            if (textOf(el) === 'Categories') inside = true;
+            continue;
+          }
+          if (headers.has(textOf(el))) break;
+          const tag = (el.tagName || '').toUpperCase();
+          if (tag === 'IMG') {
+            const src = el.getAttribute('src') || '';
+            if (/\\/card_category\\/label\\//i.test(src)) {
+              push(el.getAttribute('alt') || '');
+              push(el.getAttribute('title') || '');
+            }
+          } else if (tag === 'A') {
+            const href = el.getAttribute('href') || '';
+            if (/\\/categories\\//i.test(href)) {
+              push(textOf(el));
+            }
+          }
+        }
+        return out;
+    };
+    const imageUrls = () => {
+        // Resolve and dedupe here so repeated sprites never cross the bridge.
+        const seen = new Set();
+        for (const img of document.images) {
+          const src = img.getAttribute('src');
+          if (!src) continue;
+          try { seen.add(new URL(src, document.baseURI).href); } catch (e) {}
+        }
+        return Array.from(seen);
+    };
+    const h1 = document.querySelector('h1');
+    return {
+        body_text: document.body.innerText,
+        image_urls: imageUrls(),
+        cats1: altOrTitle(Array.from(document.querySelectorAll('a[href*="/categories/"] img'))),
+        cats2: altOrTitle(Array.from(document.querySelectorAll('img[src*="/card_category/label/"]'))),
+        cats3: categoriesBetweenHeaders(),
+        h1: h1 ? h1.textContent : null,
+        title: document.title,
+    };
+}"""
+
+def _browser_console(msg):
+    try:
+        t = msg.type() if callable(getattr(msg, "type", None)) else getattr(msg, "type", None)
+        text = msg.text() if callable(getattr(msg, "text", None)) else getattr(msg, "text", None)
+        logging.debug("BROWSER %s: %s", t, text)
+    except Exception as e:
+        logging.debug("BROWSER console log skipped (%s)", e)
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+TRACKER_HOST_RE = re.compile(r"google-analytics|googletagmanager|doubleclick|googlesyndication", re.IGNORECASE)
+
+async def _block_heavy_resources(route):
+    # Images are re-fetched by URL in download_assets, so the browser never needs the bytes;
+    # trackers and ad scripts only slow navigation down.
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or TRACKER_HOST_RE.search(urlparse(request.url).netloc):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def process_card(
+    page,
+    session: requests.Session,
+    downloaded: Dict[str, Path],
+    blob_index: Dict[str, Dict],
+    cache: sqlite3.Connection,
+    card_url: str,
+    i: int,
+    total: int,
+) -> None:
+    """Scrape one card page on a pooled tab so several cards can be in flight at once."""
+    try:
+        logging.info("Processing card %d/%d -> %s", i, total, card_url)
+        await page.goto(card_url, wait_until="domcontentloaded", timeout=TIMEOUT)
+        try:
+            await page.wait_for_selector("h1", timeout=SELECTOR_TIMEOUT)
+        except PWTimeoutError:
+            logging.warning("No <h1> rendered on %s; scraping what is there", card_url)
+
+        # Screenshot
+        if ENABLE_SCREENSHOTS:
+            shot_dir = LOGDIR / "screens"
+            shot_dir.mkdir(parents=True, exist_ok=True)
+            shot_file = shot_dir / f"card-{i}.jpg"
+            try:
+                await page.screenshot(path=str(shot_file), clip={"x": 0, "y": 0, **VIEWPORT}, type="jpeg", quality=60)
+                logging.info("Saved page screenshot: %s", shot_file)
+            except Exception as e:
+                logging.warning("Screenshot failed: %s", e)
+
+        # ---- Sources (one round-trip for everything we read off the DOM) ----
+        dom = await page.evaluate(COLLECT_PAGE_JS, HEADERS)
+        page_text = dom["body_text"]
+
+        image_urls = dom["image_urls"]
+        logging.info("Found %d images", len(image_urls))
+
+        # ---- Parse TEXT sections ----
+        sections = _split_sections(page_text)
+
+        # Leader
+        leader_skill = _clean_leader(sections.get("Leader Skill") or [])
+
+        # Super / Ultra from text blocks
+        super_name, super_effect = _clean_super_like(sections.get("Super Attack") or [])
+        ultra_name, ultra_effect = _clean_super_like(sections.get("Ultra Super Attack") or [])
+
+        # --- Fallbacks to guarantee Super/Ultra ---
+        if not super_name:
+            mS = SUPER_FALLBACK_RE.search(page_text)
+            if mS:
+                block = [ln.strip() for ln in mS.group(1).splitlines() if ln.strip()]
+                sn, se = _clean_super_like(block)
+                super_name = super_name or sn
+                super_effect = super_effect or se
+
+        if not ultra_name:
+            mU = ULTRA_FALLBACK_RE.search(page_text)
+            if mU:
+                block = [ln.strip() for ln in mU.group(1).splitlines() if ln.strip()]
+                un, ue = _clean_super_like(block)
+                ultra_name = ultra_name or un
+                ultra_effect = ultra_effect or ue
+
+        # Passive
+        passive_block = sections.get("Passive Skill") or []
+        passive_name = passive_block[0] if passive_block else None
+        passive_effect_lines = passive_block[1:] if len(passive_block) > 1 else []
+        passive_effect = _group_passive_lines(passive_effect_lines)
+
+        # Active + Activation
+        active_name, active_effect = _clean_active(sections.get("Active Skill") or [])
+        activation_conditions = _clean_activation(sections.get("Activation Condition(s)") or [])
+
+        # Link Skills
+        link_skills = _clean_links(sections.get("Link Skills") or [])
+
+        # -------------- Categories (robust DOM strategies) --------------
+        # Strategy 1: <a href="/categories/..."><img alt="..."></a>
+        # Strategy 2: label sprites anywhere: img[src*="/card_category/label/"]
+        # Strategy 3 (fallback): between "Categories" and next header, collect image alts/titles + anchor text
+        cats1, cats2, cats3 = dom["cats1"], dom["cats2"], dom["cats3"]
+        logging.debug("Categories strategy1 (a[href*='/categories/'] img): %s", cats1)
+        logging.debug("Categories strategy2 (img[src*='/card_category/label/']): %s", cats2)
+        logging.debug("Categories strategy3 (between header): %s", cats3)
+
+        # Merge (priority: 1, then 2, then 3), then clean/dedup
+        merged_cats = list(dict.fromkeys(
+            s for pool in (cats1, cats2, cats3) for c in pool or [] if (s := (c or "").strip())
+        ))
+
+        categories = _clean_categories_python(merged_cats)
+        logging.info("Categories merged/cleaned (%d): %s", len(categories), categories)
+
+        # Stats + release + rarity/type
+        fields = _scan_page_fields(page_text)
+        stats = _parse_stats(sections.get("Stats") or [], fields)
+        release_date, tz = _parse_release(fields)
+        rarity, type_icon = detect_rarity_and_type_from_images(image_urls)
+
+        # Names/titles
+        h1 = dom["h1"] or ""
+        page_title = dom["title"] or ""
+        display_name = h1.strip() if h1.strip() else page_title.strip()
+
+        # Folder & writes
+        prefix = f"{rarity} " if rarity else ""
+        folder_name = sanitize_filename(f"{prefix}{display_name or 'Unknown Card'}")
+        card_dir = OUTROOT / folder_name
+        assets_dir = card_dir / "assets"
+        card_dir.mkdir(parents=True, exist_ok=True)
+
+        if SAVE_PAGE_HTML:
+            write_if_changed(card_dir / "page.html", (await page.content()).encode("utf-8"))
+        write_if_changed(card_dir / "PAGE_TEXT.txt", page_text.encode("utf-8"))
+        logging.info("Saved page sources to %s", card_dir)
+
+        meta = {
+            "page_title": page_title,
+            "display_name": display_name,
+            "release_date": release_date,
+            "timezone": tz,
+            "leader_skill": leader_skill,
+            "super_attack": {"name": super_name, "effect": super_effect},
+            "ultra_super_attack": {"name": ultra_name, "effect": ultra_effect},
+            "passive_skill": {"name": passive_name, "effect": passive_effect},
+            "active_skill": {
+                "name": active_name,
+                "effect": active_effect,
+                "activation_conditions": activation_conditions,
+            },
+            "link_skills": link_skills,
+            "categories": categories,
+            "stats": stats,
+            "source_url": card_url,
+            "rarity_detected": rarity,
+            "type_icon_filename": type_icon,
+            "image_urls": image_urls,
+        }
+        write_if_changed(card_dir / "METADATA.json", dump_json_bytes(meta))
+        logging.info("Wrote METADATA.json")
+
+        saved = await download_assets(session, image_urls, assets_dir, downloaded, blob_index)
+        logging.info("Saved %d assets into %s", len(saved), assets_dir)
+
+        (card_dir / "ATTRIBUTION.txt").write_text(
+            "Data and image asset links collected from DokkanInfo.\n"
+            f"Source page: {card_url}\n"
+            "Site: https://dokkaninfo.com\n\n"
+            "Notes:\n"
+            "- Personal/educational use.\n"
+            "- Respect the site's Terms and original owners' rights.\n"
+            "- If you share output, credit: “Data/images via dokkaninfo.com”.\n",
+            encoding="utf-8",
+        )
+        logging.info("Wrote attribution file")
+
+        record_card(cache, card_url, release_date, card_dir / "METADATA.json")
+
+        await asyncio.sleep(SLEEP_BETWEEN_CARDS)
+    except PWTimeoutError as e:
+        logging.exception("Playwright timeout on %s: %s", card_url, e)
+    except Exception as e:
+        logging.exception("Unexpected error on %s: %s", card_url, e)
+
+async def main(force: bool = False):
     log_path = setup_logging()
     logging.info("Starting DokkanInfo scraper (non-headless)")
 
     OUTROOT.mkdir(parents=True, exist_ok=True)
+    BLOB_DIR.mkdir(parents=True, exist_ok=True)
+    session = build_session()
+    downloaded: Dict[str, Path] = {}
+    blob_index = load_blob_index()
+    cache = open_card_cache()
 
-    with sync_playwright() as p:
+    async with async_playwright() as p:
         logging.info("Launching Chromium (headless=%s, slow_mo=%sms)", HEADLESS, SLOW_MO_MS)
-        browser = p.chromium.launch(headless=HEADLESS, slow_mo=SLOW_MO_MS)
-        context = browser.new_context(user_agent=USER_AGENT, locale="en-US", viewport={"width": 1400, "height": 900})
-        page = context.new_page()
-
-        def _browser_console(msg):
-            try:
-                t = msg.type() if callable(getattr(msg, "type", None)) else getattr(msg, "type", None)
-                text = msg.text() if callable(getattr(msg, "text", None)) else getattr(msg, "text", None)
-                logging.debug("BROWSER %s: %s", t, text)
-            except Exception as e:
-                logging.debug("BROWSER console log skipped (%s)", e)
+        browser = await p.chromium.launch(headless=HEADLESS, slow_mo=SLOW_MO_MS)
+        context = await browser.new_context(user_agent=USER_AGENT, locale="en-US", viewport=VIEWPORT)
+        await context.route("**/*", _block_heavy_resources)
+        page = await context.new_page()
         page.on("console", _browser_console)
 
-        trace_path = None
         try:
             if ENABLE_TRACE:
-                trace_path = LOGDIR / f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
-                logging.info("Tracing enabled -> %s", trace_path)
+                logging.info("Tracing enabled -> %s (one chunk per card, tabs limited to 1)", LOGDIR / "trace-card-*.zip")
                 try:
-                    context.tracing.start(screenshots=True, snapshots=True, sources=False)
+                    await context.tracing.start(screenshots=ENABLE_SCREENSHOTS, snapshots=True, sources=False)
                 except Exception as e:
                     logging.warning("Tracing start failed: %s", e)
         except Exception as e:
@@ -385,10 +824,10 @@ def main():
 
         try:
             logging.info("Opening index: %s", INDEX_URL)
-            page.goto(INDEX_URL, wait_until="domcontentloaded", timeout=TIMEOUT)
-            page.wait_for_timeout(1200)
+            await page.goto(INDEX_URL, wait_until="domcontentloaded", timeout=TIMEOUT)
+            await page.wait_for_selector('a.col-auto[href^="/cards/"]', timeout=SELECTOR_TIMEOUT)
 
-            hrefs = page.eval_on_selector_all(
+            hrefs = await page.eval_on_selector_all(
                 'a.col-auto[href^="/cards/"]',
                 "els => els.map(e => e.getAttribute('href')).filter(Boolean)",
             )
@@ -399,235 +838,39 @@ def main():
             if not links:
                 raise RuntimeError("No card anchors found matching a.col-auto[href^='/cards/'] on the index.")
 
-            for i, card_url in enumerate(links[:LIMIT_CARDS], start=1):
-                logging.info("Processing card %d/%d -> %s", i, min(LIMIT_CARDS, len(links)), card_url)
-                page.goto(card_url, wait_until="domcontentloaded", timeout=TIMEOUT)
-                page.wait_for_timeout(1500)
-
-                # Screenshot
-                shot_dir = LOGDIR / "screens"
-                shot_dir.mkdir(parents=True, exist_ok=True)
-                shot_file = shot_dir / f"card-{i}.png"
+            targets = links[:LIMIT_CARDS]
+            if not force:
+                fresh = [u for u in targets if not is_card_cached(cache, u)]
+                if len(fresh) < len(targets):
+                    logging.info("Skipping %d already-scraped card(s) (use --force to redo)", len(targets) - len(fresh))
+                targets = fresh
+
+            # Pre-warm a fixed pool of tabs; each card borrows one and hands it back.
+            # Trace chunks are context-wide, so tracing runs cards one at a time.
+            pool: asyncio.Queue = asyncio.Queue()
+            for _ in range(min(1 if ENABLE_TRACE else MAX_CONCURRENCY, len(targets))):
+                tab = await context.new_page()
+                tab.on("console", _browser_console)
+                pool.put_nowait(tab)
+
+            async def _pooled(card_url: str, i: int) -> None:
+                tab = await pool.get()
                 try:
-                    img_bytes = page.screenshot(full_page=True)
-                    shot_file.write_bytes(img_bytes)
-                    logging.info("Saved page screenshot: %s", shot_file)
-                except Exception as e:
-                    logging.warning("Screenshot failed: %s", e)
-
-                # ---- Sources ----
-                page_text = page.inner_text("body")
-                page_html = page.content()
-
-                image_urls = page.eval_on_selector_all(
-                    "img",
-                    "els => els.map(e => e.getAttribute('src')).filter(Boolean)",
-                )
-                abs_urls = []
-                seen_urls = set()
-                for s in image_urls:
-                    try:
-                        u = urljoin(page.url, s)
-                        if u not in seen_urls:
-                            seen_urls.add(u); abs_urls.append(u)
-                    except Exception:
-                        continue
-                image_urls = abs_urls
-                logging.info("Found %d images", len(image_urls))
-
-                # ---- Parse TEXT sections ----
-                sections = _split_sections(page_text)
-
-                # Leader
-                leader_skill = _clean_leader(sections.get("Leader Skill") or [])
-
-                # Super / Ultra from text blocks
-                super_name, super_effect = _clean_super_like(sections.get("Super Attack") or [])
-                ultra_name, ultra_effect = _clean_super_like(sections.get("Ultra Super Attack") or [])
-
-                # --- Fallbacks to guarantee Super/Ultra ---
-                if not super_name:
-                    mS = re.search(r"Super Attack\s+([\s\S]*?)\s+Ultra Super Attack", page_text, flags=re.IGNORECASE)
-                    if mS:
-                        block = [ln.strip() for ln in mS.group(1).splitlines() if ln.strip()]
-                        sn, se = _clean_super_like(block)
-                        super_name = super_name or sn
-                        super_effect = super_effect or se
-
-                if not ultra_name:
-                    mU = re.search(
-                        r"Ultra Super Attack\s+([\s\S]*?)\s+(Passive Skill|Active Skill|Link Skills|Categories|Stats)",
-                        page_text,
-                        flags=re.IGNORECASE,
-                    )
-                    if mU:
-                        block = [ln.strip() for ln in mU.group(1).splitlines() if ln.strip()]
-                        un, ue = _clean_super_like(block)
-                        ultra_name = ultra_name or un
-                        ultra_effect = ultra_effect or ue
-
-                # Passive
-                passive_block = sections.get("Passive Skill") or []
-                passive_name = passive_block[0] if passive_block else None
-                passive_effect_lines = passive_block[1:] if len(passive_block) > 1 else []
-                passive_effect = _group_passive_lines(passive_effect_lines)
-
-                # Active + Activation
-                active_name, active_effect = _clean_active(sections.get("Active Skill") or [])
-                activation_conditions = _clean_activation(sections.get("Activation Condition(s)") or [])
-
-                # Link Skills
-                link_skills = _clean_links(sections.get("Link Skills") or [])
-
-                # -------------- Categories (robust DOM strategies) --------------
-                # Strategy 1: <a href="/categories/..."><img alt="..."></a>
-                cats1 = page.eval_on_selector_all(
-                    'a[href*="/categories/"] img',
-                    'els => els.map(e => e.getAttribute("alt") || e.getAttribute("title") || "").filter(Boolean)',
-                )
-                logging.debug("Categories strategy1 (a[href*='/categories/'] img): %s", cats1)
-
-                # Strategy 2: label sprites anywhere: img[src*="/card_category/label/"]
-                cats2 = page.eval_on_selector_all(
-                    'img[src*="/card_category/label/"]',
-                    'els => els.map(e => e.getAttribute("alt") || e.getAttribute("title") || "").filter(Boolean)',
-                )
-                logging.debug("Categories strategy2 (img[src*='/card_category/label/']): %s", cats2)
-
-                # Strategy 3 (fallback): between "Categories" and next header, collect image alts/titles + anchor text
-                cats3 = page.evaluate(
-                    """(HEADERS) => {
-                        const out = [];
-                        const push = (v) => { if (v && String(v).trim()) out.push(String(v).trim()); };
-                        const all = Array.from(document.querySelectorAll('body *'));
-                        const textOf = el => (el && (el.textContent || '').trim()) || '';
-                        const isHeaderText = (txt) => HEADERS.includes((txt || '').trim());
-
-                        let catEl = null;
-                        for (const el of all) {
-                          if (textOf(el) === 'Categories') { catEl = el; break; }
-                        }
-                        if (!catEl) return [];
-
-                        let start = false, nextHeader = null;
-                        for (const el of all) {
-                          if (el === catEl) { start = true; continue; }
-                          if (!start) continue;
-                          if (isHeaderText(textOf(el))) { nextHeader = el; break; }
-                        }
-
-                        const between = [];
-                        start = false;
-                        for (const el of all) {
-                          if (el === catEl) { start = true; continue; }
-                          if (!start) continue;
-                          if (nextHeader && el === nextHeader) break;
-                          between.push(el);
-                        }
-
-                        between.forEach(el => {
-                          if ((el.tagName || '').toUpperCase() === 'IMG') {
-                            const src = el.getAttribute('src') || '';
-                            if (/\\/card_category\\/label\\//i.test(src)) {
-                              push(el.getAttribute('alt') || '');
-                              push(el.getAttribute('title') || '');
-                            }
-                          }
-                          if ((el.tagName || '').toUpperCase() === 'A') {
-                            const href = el.getAttribute('href') || '';
-                            if (/\\/categories\\//i.test(href)) {
-                              push(textOf(el));
-                            }
-                          }
-                        });
-                        return out;
-                    }""",
-                    HEADERS,
-                )
-                logging.debug("Categories strategy3 (between header): %s", cats3)
-
-                # Merge (priority: 1, then 2, then 3), then clean/dedup
-                merged_cats = []
-                seen_cat = set()
-                for pool in (cats1, cats2, cats3):
-                    for c in pool or []:
-                        s = (c or "").strip()
-                        if not s: continue
-                        if s in seen_cat: continue
-                        seen_cat.add(s)
-                        merged_cats.append(s)
-
-                categories = _clean_categories_python(merged_cats)
-                logging.info("Categories merged/cleaned (%d): %s", len(categories), categories)
-
-                # Stats + release + rarity/type
-                stats = _parse_stats(sections.get("Stats") or [], page_text)
-                release_date, tz = _parse_release(page_text)
-                rarity, type_icon = detect_rarity_and_type_from_images(image_urls)
-
-                # Names/titles
-                try:
-                    h1 = page.text_content("h1") or ""
-                    display_name = h1.strip() if h1.strip() else (page.title() or "").strip()
-                except Exception:
-                    display_name = (page.title() or "").strip()
-                page_title = page.title()
-
-                # Folder & writes
-                prefix = f"{rarity} " if rarity else ""
-                folder_name = sanitize_filename(f"{prefix}{display_name or 'Unknown Card'}")
-                card_dir = OUTROOT / folder_name
-                assets_dir = card_dir / "assets"
-                card_dir.mkdir(parents=True, exist_ok=True)
-
-                (card_dir / "page.html").write_text(page_html, encoding="utf-8")
-                (card_dir / "PAGE_TEXT.txt").write_text(page_text, encoding="utf-8")
-                logging.info("Saved page sources to %s", card_dir)
-
-                meta = {
-                    "page_title": page_title,
-                    "display_name": display_name,
-                    "release_date": release_date,
-                    "timezone": tz,
-                    "leader_skill": leader_skill,
-                    "super_attack": {"name": super_name, "effect": super_effect},
-                    "ultra_super_attack": {"name": ultra_name, "effect": ultra_effect},
-                    "passive_skill": {"name": passive_name, "effect": passive_effect},
-                    "active_skill": {
-                        "name": active_name,
-                        "effect": active_effect,
-                        "activation_conditions": activation_conditions,
-                    },
-                    "link_skills": link_skills,
-                    "categories": categories,
-                    "stats": stats,
-                    "source_url": card_url,
-                    "rarity_detected": rarity,
-                    "type_icon_filename": type_icon,
-                    "image_urls": image_urls,
-                }
-                (card_dir / "METADATA.json").write_text(
-                    json.dumps(meta, ensure_ascii=False, indent=2),
-                    encoding="utf-8",
-                )
-                logging.info("Wrote METADATA.json")
-
-                saved = download_assets(image_urls, assets_dir)
-                logging.info("Saved %d assets into %s", len(saved), assets_dir)
-
-                (card_dir / "ATTRIBUTION.txt").write_text(
-                    "Data and image asset links collected from DokkanInfo.\n"
-                    f"Source page: {card_url}\n"
-                    "Site: https://dokkaninfo.com\n\n"
-                    "Notes:\n"
-                    "- Personal/educational use.\n"
-                    "- Respect the site's Terms and original owners' rights.\n"
-                    "- If you share output, credit: “Data/images via dokkaninfo.com”.\n",
-                    encoding="utf-8",
-                )
-                logging.info("Wrote attribution file")
-
-                time.sleep(SLEEP_BETWEEN_CARDS)
+                    if ENABLE_TRACE:
+                        await context.tracing.start_chunk(title=card_url)
+                    await process_card(tab, session, downloaded, blob_index, cache, card_url, i, len(targets))
+                finally:
+                    if ENABLE_TRACE:
+                        chunk_path = LOGDIR / f"trace-card-{i}.zip"
+                        try:
+                            await context.tracing.stop_chunk(path=str(chunk_path))
+                            logging.info("Saved trace: %s", chunk_path)
+                        except Exception as te:
+                            logging.warning("Trace chunk export failed: %s", te)
+                    pool.put_nowait(tab)
+
+            logging.info("Scraping %d card(s) on %d pooled tab(s)", len(targets), pool.qsize())
+            await asyncio.gather(*(_pooled(u, i) for i, u in enumerate(targets, start=1)))
 
         except PWTimeoutError as e:
             logging.exception("Playwright timeout: %s", e)
@@ -636,21 +879,19 @@ def main():
         finally:
             if ENABLE_TRACE:
                 try:
-                    if hasattr(context.tracing, "export"):
-                        context.tracing.stop()
-                        try:
-                            context.tracing.export(path=str(trace_path))
-                            logging.info("Saved trace: %s", trace_path)
-                        except Exception as ee:
-                            logging.warning("Trace export failed: %s", ee)
-                    else:
-                        context.tracing.stop(path=str(trace_path))
-                        logging.info("Saved trace (stop with path): %s", trace_path)
+                    await context.tracing.stop()
                 except Exception as te:
                     logging.warning("Tracing stop failed: %s", te)
-            browser.close()
+            await browser.close()
+            ASSET_POOL.shutdown(wait=True)
+            session.close()
+            save_blob_index(blob_index)
+            cache.close()
             logging.info("Browser closed. Log file: %s", log_path)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape DokkanInfo cards.")
+    parser.add_argument("--force", action="store_true", help="re-scrape cards already recorded in the cache")
+    args = parser.parse_args()
+    asyncio.run(main(force=args.force))
@@ -67,17 +67,33 @@
 
 import json
 import logging
+import os
+import queue
 import re
+import shutil
+import threading
 import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
-from pathlib import Path, PurePosixPath
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Set
 from urllib.parse import urljoin, urlparse, parse_qsl, urlencode, urlunparse
 
+import lxml.html
+from lxml import etree
 import requests
-from bs4 import BeautifulSoup, NavigableString, Tag
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
 # ------------ Config -------------
 BASE = "https://dokkaninfo.com"
 INDEX_URL = f"{BASE}/cards?sort=open_at_eza"   # includes EZAs
@@ -94,14 +110,19 @@ USER_AGENT = (
 )
 REQUEST_HEADERS = {"User-Agent": USER_AGENT, "Referer": BASE}
 CATEGORIES_INDEX_PATH = OUTROOT / "CATEGORIES_INDEX.json"
+KNOWN_IDS_PATH = OUTROOT / "_known_ids.txt"   # startup cache of existing unit ids (trusted while newer than CARDS_INDEX.json)
+VARIANT_LOGS_DIR = OUTROOT / "_variant_logs"   # per-family variant journals; METADATA.json is written once per family
 
 TIMEOUT = 60_000
 SLEEP_BETWEEN_CARDS = 0
+FAMILY_WORKERS = 4      # families scraped in parallel; each worker thread drives its own browser (sync Playwright is per-thread)
+ASSET_WORKERS = 8       # concurrent image GETs per card; FAMILY_WORKERS * ASSET_WORKERS stays within the session pool (32)
 MAX_PAGES = 200
 MAX_NEW_CARDS = 200     # limit how many BASE families to save if COUNT_MODE="bases"; if "total", counts forms incl. transformations
 COUNT_MODE = "bases"    # "bases" or "total"
 
 MAX_FAMILY_SIZE = 40    # safety cap for BFS across transformations/variations
+FLUSH_EVERY_FAMILIES = 25   # CARDS_INDEX / CATEGORIES_INDEX are kept in memory and written every N families (and on exit)
 
 # NEW: Skip already-scraped families entirely (uses CARDS_INDEX.json and on-disk folders)
 SKIP_EXISTING = True
@@ -125,41 +146,64 @@ HEADERS = [
     "Categories",
     "Stats",
 ]
+HEADERS_SET = frozenset(HEADERS)
 
-CATEGORY_BLACKLIST_TOKENS = {
+CATEGORY_BLACKLIST_TOKENS = frozenset({
     "background", "icon", "rarity", "element", "eza", "undefined",
     "venatus", "show more", "links", "categories",
-}
+})
 EXT_FILE_PATTERN = re.compile(r"\.(png|jpg|jpeg|gif|webp)$", re.IGNORECASE)
 
 CARD_ID_IN_HREF_RE = re.compile(r"/cards/(\d+)")
 CARD_ID_IN_SRC_RE = re.compile(r"card_(\d+)_", re.IGNORECASE)
 
-TYPE_SET = {"str", "teq", "int", "agl", "phy"}
+TYPE_SET = frozenset({"str", "teq", "int", "agl", "phy"})
 RARITY_RANK = {"N":0, "R":1, "SR":2, "SSR":3, "UR":4, "LR":5}
 
-AWAKEN_ROW_SEL = "div.row.d-flex.flex-wrap.border.border-1.card-icon"
 CAT_ID_IN_HREF = re.compile(r"/categories/(\d+)$")
 
-def parse_categories_detailed(soup: BeautifulSoup, page_url: str) -> List[Dict[str, Optional[str]]]:
+# Elements the soup keeps, at any depth, each with its whole subtree. Body-level <script>/<style>/<svg>
+# blobs never become bs4 objects; everything the soup readers look at lives under these
+# (check_soup_strainer.py compares them against a full parse).
+# Whole-page text is not one of them: it comes from the lxml tree (_el_text), which keeps it all.
+SOUP_STRAINER = SoupStrainer([
+    "title", "div", "main", "section", "article", "header", "footer", "nav",
+    "table", "h1", "p", "a", "img", "b", "span", "ul", "li",
+])
+
+def _soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, "lxml", parse_only=SOUP_STRAINER)
+
+def parse_html(html: str):
+    """lxml (C) tree for the hot lookups; bs4 stays for the stats table, type token and EZA dropdown."""
+    if not html:
+        return None
+    return lxml.html.document_fromstring(html)
+
+def _xp_class(*names: str) -> str:
+    """XPath predicate equivalent to CSS `.a.b` (every class token present)."""
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {n} ')" for n in names)
+
+def parse_categories_detailed(tree, page_url: str) -> List[Dict[str, Optional[str]]]:
     """
     Returns: [{"id":"50","name":"Inhuman Deeds","asset_rel":"dokkaninfo.com/...png","locale":"en"}, ...]
     """
     items: List[Dict[str, Optional[str]]] = []
-    for a in soup.select('a[href^="/categories/"]'):
+    if tree is None:
+        return items
+    for a in tree.xpath('//a[starts-with(@href, "/categories/")]'):
         href = a.get("href") or ""
         m = CAT_ID_IN_HREF.search(href)
         if not m:
             continue
         cid = m.group(1)
-        im = a.find("img")
-        if not im:
+        im = a.find(".//img")
+        if im is None:
             continue
         name = (im.get("alt") or im.get("title") or "").strip()
         src = im.get("src") or ""
         absu = urljoin(page_url, src)
-        relp = _url_to_asset_rel(absu)
-        rels = str(relp) if relp else None
+        rels = _url_to_asset_rel(absu)
         loc = _extract_locale_from_rel(rels) if rels else None
         items.append({"id": cid, "name": name, "asset_rel": rels, "locale": loc})
     # de-dup per (id, locale, path)
@@ -174,14 +218,13 @@ def parse_categories_detailed(soup: BeautifulSoup, page_url: str) -> List[Dict[s
 def load_category_index() -> Dict[str, dict]:
     if CATEGORIES_INDEX_PATH.exists():
         try:
-            return json.loads(CATEGORIES_INDEX_PATH.read_text(encoding="utf-8"))
+            return load_json_file(CATEGORIES_INDEX_PATH)
         except Exception:
             pass
     return {}
 
 def save_category_index(index: Dict[str, dict]) -> None:
-    CATEGORIES_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-    CATEGORIES_INDEX_PATH.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_json_atomic(CATEGORIES_INDEX_PATH, index)
 
 def _index_add_category_item(idx: Dict[str, dict], item: Dict[str, Optional[str]]) -> None:
     """
@@ -206,31 +249,29 @@ def _index_add_category_item(idx: Dict[str, dict], item: Dict[str, Optional[str]
         node["slug"] = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
     idx[cid] = node
 
-def _collect_card_ids_in_row(row: Tag) -> list[str]:
-    ids = []
-    for a in row.select("a.card-icon[href]"):
-        href = a.get("href") or ""
-        m = CARD_ID_IN_HREF_RE.search(href)
-        if m:
-            ids.append(m.group(1))
+AWAKEN_ROW_XPATH = "//div[{}]".format(_xp_class("row", "d-flex", "flex-wrap", "border", "border-1", "card-icon"))
+CARD_ICON_HREFS_XPATH = ".//a[{}]/@href".format(_xp_class("card-icon"))
+
+def _collect_card_ids_in_row(row) -> list[str]:
     # Keep order but unique
     out, seen = [], set()
-    for i in ids:
-        if i not in seen:
-            seen.add(i); out.append(i)
+    for href in row.xpath(CARD_ICON_HREFS_XPATH):
+        m = CARD_ID_IN_HREF_RE.search(href)
+        if m and m.group(1) not in seen:
+            seen.add(m.group(1)); out.append(m.group(1))
     return out
 
-def parse_awaken_links_from_soup(soup: BeautifulSoup, rarity_hint: Optional[str]) -> dict:
+def parse_awaken_links_from_tree(tree, rarity_hint: Optional[str]) -> dict:
     """Return {'from': [...], 'to': [...]} using headings when present; fallback by rarity."""
     res = {"from": [], "to": []}
-    rows = soup.select(AWAKEN_ROW_SEL)
+    seen = {"from": set(), "to": set()}
+    rows = tree.xpath(AWAKEN_ROW_XPATH) if tree is not None else []
     if not rows:
         return res
 
-    def nearby_heading_text(row: Tag) -> str:
-        prev = row.find_previous_sibling("div")
-        txt = (prev.get_text(" ", strip=True).lower() if prev else "")
-        return txt
+    def nearby_heading_text(row) -> str:
+        prev = next(row.itersiblings("div", preceding=True), None)
+        return _el_text(prev, " ", strip=True).lower() if prev is not None else ""
 
     for row in rows:
         ids = _collect_card_ids_in_row(row)
@@ -238,24 +279,28 @@ def parse_awaken_links_from_soup(soup: BeautifulSoup, rarity_hint: Optional[str]
             continue
         label = nearby_heading_text(row)
         if "awakened from" in label:
-            res["from"].extend(ids); continue
-        if "awakens to" in label or "dokkan awaken" in label:
-            res["to"].extend(ids); continue
-
+            key = "from"
+        elif "awakens to" in label or "dokkan awaken" in label:
+            key = "to"
         # Fallback heuristic: LR pages almost always show the "from" strip only.
-        if (rarity_hint or "").upper() == "LR":
-            res["from"].extend(ids)
+        elif (rarity_hint or "").upper() == "LR":
+            key = "from"
         else:
             # SSR-only pages sometimes show the "to" strip only.
-            res["to"].extend(ids)
+            key = "to"
 
-    # de-dupe
-    res["from"] = list(dict.fromkeys(res["from"]))
-    res["to"] = list(dict.fromkeys(res["to"]))
+        # de-dupe across rows while extending
+        for cid in ids:
+            if cid not in seen[key]:
+                seen[key].add(cid); res[key].append(cid)
     return res
 
 def _rarity_rank(r: Optional[str]) -> int:
-    return RARITY_RANK.get((r or "").upper(), -1)
+    if not r:
+        return -1
+    # rarities are stored uppercase by detect_rarity_from_dom; only normalise odd input
+    rank = RARITY_RANK.get(r)
+    return rank if rank is not None else RARITY_RANK.get(r.upper(), -1)
 # ------------ Logging -------------
 def setup_logging() -> Path:
     LOGDIR.mkdir(parents=True, exist_ok=True)
@@ -282,17 +327,97 @@ def setup_logging() -> Path:
     return log_path
 
 # ------------ Index helpers -------------
+def dump_json_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def load_json_file(path: Path):
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def _write_json_atomic(path: Path, obj) -> None:
+    """Write to a sibling .tmp and os.replace() it in, so an interrupted run never leaves half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(dump_json_bytes(obj))
+    os.replace(tmp, path)
+
+def _index_log_path() -> Path:
+    # append-only journal next to CARDS_INDEX.json; holds upserts made since the last snapshot
+    return INDEX_PATH.with_name("_index.log.jsonl")
+
+def _dump_json_line(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+def _load_json_line(line: bytes):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+def append_index_log(char_id: str, node: dict) -> None:
+    log_path = _index_log_path()
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as f:
+        f.write(_dump_json_line({"op": "upsert", "cid": char_id, "node": node}))
+
+def _replay_index_log(index: Dict[str, dict]) -> int:
+    log_path = _index_log_path()
+    if not log_path.exists():
+        return 0
+    applied = 0
+    with open(log_path, "rb") as f:
+        for line in f:
+            try:
+                rec = _load_json_line(line)
+            except ValueError:
+                break   # torn tail from a crash mid-append
+            if rec.get("op") == "upsert" and rec.get("cid"):
+                index[rec["cid"]] = rec.get("node") or {}
+                applied += 1
+    return applied
+
 def load_index() -> Dict[str, dict]:
+    index: Dict[str, dict] = {}
     if INDEX_PATH.exists():
         try:
-            return json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+            index = load_json_file(INDEX_PATH)
         except Exception as e:
             logging.warning("Failed to read index (%s). Starting fresh.", e)
-    return {}
+    # Recover upserts a crashed/killed run journaled but never snapshotted
+    replayed = _replay_index_log(index)
+    if replayed:
+        logging.info("Replayed %d index update(s) from %s", replayed, _index_log_path())
+        save_index(index)
+    return index
 
 def save_index(index: Dict[str, dict]) -> None:
-    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-    INDEX_PATH.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_json_atomic(INDEX_PATH, index)
+    # the snapshot now covers everything journaled so far
+    _index_log_path().unlink(missing_ok=True)
+
+def flush_index(index: Dict[str, dict],
+                cat_index: Optional[Dict[str, dict]] = None,
+                known_ids: Optional[Set[str]] = None) -> None:
+    save_index(index)
+    if cat_index is not None:
+        save_category_index(cat_index)
+    # after the index, so the known-ids file stays at least as new as it
+    if known_ids is not None:
+        save_known_ids(known_ids | set(index))
+
+@contextmanager
+def _flush_on_exit(index: Dict[str, dict], cat_index: Dict[str, dict], known_ids: Set[str]):
+    try:
+        yield
+    except KeyboardInterrupt:
+        logging.warning("Interrupted; flushing indexes before exit.")
+        raise
+    finally:
+        flush_index(index, cat_index, known_ids)
 
 def index_add_variant(index: Dict[str, dict],
                       char_id: str,
@@ -324,7 +449,7 @@ def index_add_variant(index: Dict[str, dict],
     if variant_key not in node["variants"]:
         node["variants"].append(variant_key)
 
-    save_index(index)
+    append_index_log(char_id, node)
 
 # ------------ NEW: existing detection / skipping -------------
 EXISTING_ID_FROM_FOLDER_RE = re.compile(r"-\s*(\d+)$")
@@ -333,81 +458,93 @@ def _parse_unit_id_from_folder_name(name: str) -> Optional[str]:
     m = EXISTING_ID_FROM_FOLDER_RE.search(name)
     return m.group(1) if m else None
 
+def load_known_ids() -> Optional[Set[str]]:
+    """Ids saved by the last run, or None if missing or older than CARDS_INDEX.json."""
+    try:
+        known_mtime = KNOWN_IDS_PATH.stat().st_mtime
+        if INDEX_PATH.exists() and INDEX_PATH.stat().st_mtime > known_mtime:
+            return None
+        return {ln.strip() for ln in KNOWN_IDS_PATH.read_text(encoding="utf-8").splitlines() if ln.strip()}
+    except OSError:
+        return None
+
+def save_known_ids(ids: Set[str]) -> None:
+    KNOWN_IDS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = KNOWN_IDS_PATH.with_suffix(".txt.tmp")
+    tmp.write_text("\n".join(sorted(ids)) + "\n", encoding="utf-8")
+    os.replace(tmp, KNOWN_IDS_PATH)
+
 def collect_existing_unit_ids(outroot: Path, index: Dict[str, dict]) -> Set[str]:
     existing: Set[str] = set()
     # From index (authoritative if present)
     existing.update([k for k in (index or {}).keys()])
-    # From disk folders
+    known = load_known_ids()
+    if known is not None:
+        existing.update(known)
+        return existing
+    # From disk folders: the id is the folder-name suffix; METADATA.json only for odd names
     if outroot.exists():
         for child in outroot.iterdir():
             if not child.is_dir():
                 continue
-            # Try METADATA.json first
+            cid = _parse_unit_id_from_folder_name(child.name)
             meta = child / "METADATA.json"
-            cid: Optional[str] = None
-            if meta.exists():
+            if not cid and meta.exists():
                 try:
-                    data = json.loads(meta.read_text(encoding="utf-8"))
+                    data = load_json_file(meta)
                     cid_val = data.get("unit_id") or data.get("form_id")
                     if cid_val:
                         cid = str(cid_val)
                 except Exception:
                     cid = None
-            if not cid:
-                cid = _parse_unit_id_from_folder_name(child.name)
             if cid:
                 existing.add(cid)
+    save_known_ids(existing)
     return existing
 
 # ------------ Helpers -------------
+SANITIZE_TABLE = str.maketrans({
+    ":": " -", "/": "-", "\\": "-", "|": "-", "*": "x", "?": "", '"': "'",
+})
+
 def sanitize_filename(name: str) -> str:
-    name = (
-        name.replace(":", " -")
-        .replace("/", "-")
-        .replace("\\", "-")
-        .replace("|", "-")
-        .replace("*", "x")
-        .replace("?", "")
-        .replace('"', "'")
-        .strip()
-    )
-    name = re.sub(r"\s+", " ", name)
+    name = name.translate(SANITIZE_TABLE).strip()
+    name = WS_RE.sub(" ", name)
     return name.rstrip(" .")
 
 def extract_character_id_from_url(url: str) -> Optional[str]:
     m = CARD_ID_IN_HREF_RE.search(url)
     return m.group(1) if m else None
 
-def extract_ids_from_col5_images(page_html: str) -> List[str]:
-    soup = BeautifulSoup(page_html, "lxml")
-    required = {"row", "cursor-pointer", "unselectable", "border", "border-2", "border-dark", "margin-top-bottom-5"}
-    header_div = None
-    for div in soup.find_all("div"):
-        cls = set(div.get("class") or [])
-        if required.issubset(cls):
-            header_div = div
-            break
-    if not header_div:
+COL5_HEADER_XPATH = "(//div[{}])[1]".format(
+    _xp_class("row", "cursor-pointer", "unselectable", "border", "border-2", "border-dark", "margin-top-bottom-5")
+)
+COL5_TILE_XPATH = ".//div[{}]".format(_xp_class("col-5"))
+
+def extract_ids_from_col5_images_from_html(page_html: str) -> List[str]:
+    return extract_ids_from_col5_images(parse_html(page_html))
+
+def extract_ids_from_col5_images(tree) -> List[str]:
+    """Card ids from the header tile strip, given a page tree from parse_html()."""
+    header_divs = tree.xpath(COL5_HEADER_XPATH) if tree is not None else []
+    if not header_divs:
         return []
-    tiles = header_div.find_all("div", class_=lambda v: v and "col-5" in v.split())
+    tiles = header_divs[0].xpath(COL5_TILE_XPATH)
     if not tiles:
         return []
     ids: List[str] = []
     seen: Set[str] = set()
     for sub in tiles[1:]:
         # Try by link first
-        a = sub.find("a", href=CARD_ID_IN_HREF_RE)
-        if a:
-            href = a.get("href") or ""
-            mid = CARD_ID_IN_HREF_RE.search(href)
-            if mid:
-                cid = mid.group(1)
-                if cid not in seen:
-                    seen.add(cid)
-                    ids.append(cid)
-                continue
-        img = sub.find("img")
-        if not img:
+        mid = next(filter(None, (CARD_ID_IN_HREF_RE.search(h) for h in sub.xpath(".//a/@href"))), None)
+        if mid:
+            cid = mid.group(1)
+            if cid not in seen:
+                seen.add(cid)
+                ids.append(cid)
+            continue
+        img = sub.find(".//img")
+        if img is None:
             continue
         src = img.get("src") or ""
         m = CARD_ID_IN_SRC_RE.search(src)
@@ -432,6 +569,7 @@ def build_next_index_url(curr_url: str) -> str:
     return urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, new_query, parsed.fragment))
 
 # ------------ Variant helpers -------------
+@lru_cache(maxsize=4096)
 def parse_variant_from_url(url: str) -> Tuple[bool, Optional[int]]:
     parsed = urlparse(url)
     q = dict(parse_qsl(parsed.query, keep_blank_values=True))
@@ -467,21 +605,26 @@ def build_form_variant_key(form_id: str, eza: bool, step: Optional[int]) -> str:
         return f"form_{form_id}_eza"
     return f"form_{form_id}_eza_step_{step}"
 
+@lru_cache(maxsize=4096)
 def normalize_to_base_url(url: str) -> str:
     p = urlparse(url)
     return urlunparse((p.scheme, p.netloc, p.path, "", "", ""))
 
+@lru_cache(maxsize=4096)
+def _split_base(url: str) -> Tuple[str, str]:
+    """(everything before the query, '#fragment' or '')."""
+    parsed = urlparse(url)
+    head = urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, "", ""))
+    return head, (f"#{parsed.fragment}" if parsed.fragment else "")
+
 def make_variant_url(base_url: str, eza: bool, step: Optional[int]) -> str:
-    parsed = urlparse(base_url)
-    q = {}
-    if eza:
-        q["eza"] = "true"
-        if step is not None:
-            q["step"] = str(step)
-    else:
-        q["eza"] = "false"
-    new_query = urlencode(q, doseq=True)
-    return urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, new_query, parsed.fragment))
+    # Fixed-shape query, so format it directly instead of urlencode + urlunparse
+    head, frag = _split_base(base_url)
+    if not eza:
+        return f"{head}?eza=false{frag}"
+    if step is None:
+        return f"{head}?eza=true{frag}"
+    return f"{head}?eza=true&step={step}{frag}"
 
 def build_variant_label(display_name: Optional[str],
                         form_id: Optional[str],
@@ -496,23 +639,59 @@ def build_variant_label(display_name: Optional[str],
     return f"{dn} (#" + (form_id or "?") + f") — {part}"
 
 # ------------ TEXT parsing -------------
+WS_RE = re.compile(r"\s+")
+SEMI_RE = re.compile(r"\s*;\s*")
+PCT_ONLY_RE = re.compile(r"\d+\s*%$")
+SA_LV_RE = re.compile(r"\bSA\s*Lv\b", re.IGNORECASE)
+RAISES_CAUSES_RE = re.compile(r"\s*Raises ATK & DEF\s*Causes", re.IGNORECASE)
+BASIC_EFFECT_LINE_RE = re.compile(r"Basic effect\(s\):?", re.IGNORECASE)
+BASIC_EFFECT_PREFIX_RE = re.compile(r"^\s*Basic effect\(s\):\s*", re.IGNORECASE)
+FOR_EVERY_COLON_RE = re.compile(r"^(For every [^.]+?)(?!:)\s", re.IGNORECASE)
+LINK_SKILLS_RE = re.compile(r"Link Skills", re.IGNORECASE)
+COST_RE = re.compile(r"\bCost\s*:\s*(\d+)", re.IGNORECASE)
+MAX_LV_RE = re.compile(r"\bMax\s*Lv\s*:\s*(\d+)", re.IGNORECASE)
+SA_LV_VALUE_RE = re.compile(r"\bSA\s*Lv\s*:\s*(\d+)", re.IGNORECASE)
+LEADING_PATTERNS = [
+    r"^Activates the Entrance Animation",
+    r"^Ki \+\d",
+    r"^ATK",
+    r"^DEF",
+    r"^Guards all attacks",
+    r"^For every attack performed",
+    r"^For every attack received",
+    r"^Launches an additional attack",
+    r"^For every Super Attack the enemy launches",
+    r"^When receiving an Unarmed Super Attack",
+]
+LEADING_RE = re.compile("|".join(f"(?:{p})" for p in LEADING_PATTERNS), re.IGNORECASE)
+
 def _split_sections(page_text: str) -> Dict[str, List[str]]:
-    lines = [re.sub(r"\s+", " ", ln).strip() for ln in page_text.splitlines()]
+    # One pass: condense, drop empties, and note header positions as we go
+    lines: List[str] = []
     indices: List[Tuple[str, int]] = []
-    for idx, ln in enumerate(lines):
-        if ln in HEADERS:
-            indices.append((ln, idx))
+    for raw in page_text.splitlines():
+        ln = _condense_spaces(raw)
+        if not ln:
+            continue
+        if ln in HEADERS_SET:
+            indices.append((ln, len(lines)))
+        lines.append(ln)
     sections: Dict[str, List[str]] = {}
-    for i, (hdr, start_i) in enumerate(indices):
-        end_i = len(lines)
-        if i + 1 < len(indices):
-            end_i = indices[i + 1][1]
-        block = [l for l in lines[start_i + 1:end_i] if l != ""]
-        sections[hdr] = block
+    ends = [idx for _, idx in indices[1:]] + [len(lines)]
+    for (hdr, start_i), end_i in zip(indices, ends):
+        sections[hdr] = lines[start_i + 1:end_i]
     return sections
 
 def _condense_spaces(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip()
+    return WS_RE.sub(" ", s).strip()
+
+def _join_clauses(parts: List[str]) -> str:
+    """'; '-join with the spacing SEMI_RE.sub over the joined string gives, touching only parts that contain ';'."""
+    return "; ".join(SEMI_RE.sub("; ", p) if ";" in p else p for p in (p.strip() for p in parts)).strip()
+
+def _strip_basic_effect_prefix(s: str) -> str:
+    m = BASIC_EFFECT_PREFIX_RE.match(s)
+    return s[m.end():] if m else s
 
 def _dedup_sentences(text: str) -> str:
     parts = [p.strip() for p in re.split(r'(?<=[.!?])\s+', text) if p.strip()]
@@ -524,35 +703,60 @@ def _dedup_sentences(text: str) -> str:
             out.append(p)
     return " ".join(out)
 
-def _text_before_after_step_scope(soup: BeautifulSoup) -> Tuple[str, str]:
+MULTISELECT_XPATH = "(//div[{}])[1]".format(_xp_class("multiselect"))
+HIDDEN_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+def _text_before_after_step_scope(tree) -> Tuple[str, str]:
     """
     Returns (base_text, eza_text):
       - base_text: concatenated visible-ish text BEFORE the first EZA step multiselect
       - eza_text:  concatenated visible-ish text AFTER  the first EZA step multiselect
     If no multiselect is found, base_text = whole page, eza_text = "".
     """
-    step_node = soup.select_one("div.multiselect")
+    if tree is None:
+        return ("", "")
+    hits = tree.xpath(MULTISELECT_XPATH)
+    step_node = hits[0] if hits else None
     # choose a traversal root that exists
-    root = soup.body if soup.body else soup
-
-    # If no EZA step UI is present, treat the entire page as base scope
-    if not step_node:
-        return (root.get_text("\n", strip=True), "")
+    body = tree.find("body")
+    root = body if body is not None else tree
 
     before_parts: List[str] = []
     after_parts: List[str] = []
     in_after = False
 
-    # Walk the document in order and split text around the first multiselect node
-    for node in root.descendants:
-        if node is step_node:
+    # Stream the tree in document order (text on start, tail on end) and split around the multiselect.
+    # Comments arrive as a single event carrying both their text and tail.
+    hidden = 0   # depth inside script/style/template subtrees; only counted without a step UI
+    for event, el in etree.iterwalk(root, events=("start", "end", "comment")):
+        if event == "start" and el is step_node:
             in_after = True
-            continue
-        if isinstance(node, NavigableString):
-            txt = str(node)
+        texts = []
+        if step_node is not None:
+            if event != "end":
+                texts.append(el.text)
+            if event != "start" and el is not root:
+                texts.append(el.tail)
+        else:
+            # without a step UI this is get_text(): skip comments and whole script/style/template subtrees
+            if event == "start":
+                if el.tag in HIDDEN_TEXT_TAGS:
+                    hidden += 1
+                elif not hidden:
+                    texts.append(el.text)
+            else:
+                if event == "end" and el.tag in HIDDEN_TEXT_TAGS:
+                    hidden -= 1
+                if not hidden and el is not root:
+                    texts.append(el.tail)
+        for txt in texts:
             if txt and txt.strip():
                 (after_parts if in_after else before_parts).append(txt)
 
+    # If no EZA step UI is present, treat the entire page as base scope
+    if step_node is None:
+        return ("\n".join(t.strip() for t in before_parts), "")
+
     base_text = "\n".join(before_parts)
     eza_text = "\n".join(after_parts)
     return base_text, eza_text
@@ -573,14 +777,14 @@ def _clean_super_like(block: List[str]) -> Tuple[Optional[str], Optional[str]]:
     for ln in rest:
         if not ln:
             continue
-        if re.fullmatch(r"\d+\s*%$", ln):
+        if PCT_ONLY_RE.fullmatch(ln):
             continue
-        if re.search(r"\bSA\s*Lv\b", ln, flags=re.IGNORECASE):
+        if SA_LV_RE.search(ln):
             continue
         eff_parts.append(ln)
     eff = "; ".join(eff_parts)
-    eff = re.sub(r"\s*;\s*", "; ", eff)
-    eff = re.sub(r"\s*Raises ATK & DEF\s*Causes", " Raises ATK & DEF; Causes", eff, flags=re.IGNORECASE)
+    eff = SEMI_RE.sub("; ", eff)
+    eff = RAISES_CAUSES_RE.sub(" Raises ATK & DEF; Causes", eff)
     eff = _condense_spaces(eff)
     return (name or None), (eff or None)
 
@@ -591,106 +795,141 @@ PASSIVE_ARROW_UP = "passive_skill_dialog_arrow01"
 PASSIVE_ARROW_DOWN = "passive_skill_dialog_arrow02"
 ENTRANCE_REGEX = re.compile(r"(activates\s+the\s+entrance\s+animation|upon\s+the\s+character[’']?s\s+entry)", re.IGNORECASE)
 
-def _find_passive_content_div(soup: BeautifulSoup) -> Optional[Tag]:
-    bnode = soup.find("b", string=re.compile(r"^\s*Passive Skill\s*$", re.IGNORECASE))
-    if not bnode:
+PASSIVE_TITLE_RE = re.compile(r"^\s*Passive Skill\s*$", re.IGNORECASE)
+ROW_CLASS_RE = re.compile(r"\brow\b")
+BORDER_CLASS_RE = re.compile(r"\bborder\b")
+BASIC_EFFECT_TITLE_RE = re.compile(r"(?i)\s*basic effect\(s\)\s*")
+ICON_NAME_RE = re.compile(r"/([a-z0-9_]+)\.(?:png|jpg|jpeg|gif|webp)$", re.IGNORECASE)
+# one scan for the four passive markers: icon_01 once, icon_02 forever, arrow01 up, arrow02 down
+PASSIVE_MARKER_RE = re.compile(r"passive_skill_dialog_(?:icon_0(?P<icon>[12])|arrow0(?P<arrow>[12]))", re.IGNORECASE)
+# cheap XPath prefilter; the exact title match (bs4 `string=` semantics) is done in Python
+PASSIVE_TITLE_XPATH = "//b[contains(translate(., 'PASIVEKL', 'pasivekl'), 'passive skill')]"
+
+def _el_string(el) -> Optional[str]:
+    """lxml equivalent of bs4 Tag.string: the text only when the node holds exactly one string (recursively)."""
+    contents = ([el.text] if el.text else []) + [n for c in el for n in ((c,) + ((c.tail,) if c.tail else ()))]
+    if len(contents) != 1:
+        return None
+    only = contents[0]
+    if isinstance(only, str):
+        return only
+    return only.text if not isinstance(only.tag, str) else _el_string(only)
+
+def _el_strings(el):
+    """Text nodes under `el` in document order, skipping comments and nested script/style bodies (as bs4 get_text does)."""
+    if el.text:
+        yield el.text
+    for c in el:
+        if isinstance(c.tag, str) and c.tag not in HIDDEN_TEXT_TAGS:
+            yield from _el_strings(c)
+        if c.tail:
+            yield c.tail
+
+def _el_text(el, sep: str = "", strip: bool = False) -> str:
+    """bs4 get_text(sep, strip) for an lxml element."""
+    if strip:
+        return sep.join(t for t in (s.strip() for s in _el_strings(el)) if t)
+    return sep.join(_el_strings(el))
+
+def _has_class_match(el, pattern: re.Pattern) -> bool:
+    return bool(pattern.search(el.get("class") or ""))
+
+def _find_passive_content_div(tree):
+    bnode = next((b for b in tree.xpath(PASSIVE_TITLE_XPATH) if PASSIVE_TITLE_RE.search(_el_string(b) or "")), None)
+    if bnode is None:
         return None
-    title_row = bnode.find_parent("div", class_=re.compile(r"\brow\b"))
-    if not title_row:
+    title_row = next((d for d in bnode.iterancestors("div") if _has_class_match(d, ROW_CLASS_RE)), None)
+    if title_row is None:
         return None
-    content = title_row.find_next_sibling("div")
-    hops = 0
-    while content and hops < 6:
-        cls = content.get("class") or []
-        if any(c.startswith("bg-") for c in cls) or content.find("ul") or content.find("strong"):
+    for hops, content in enumerate(title_row.itersiblings("div")):
+        if hops >= 6:
+            break
+        cls = (content.get("class") or "").split()
+        if any(c.startswith("bg-") for c in cls) or content.find(".//ul") is not None or content.find(".//strong") is not None:
             return content
-        content = content.find_next_sibling("div")
-        hops += 1
-    return title_row.find_parent("div", class_=re.compile(r"\bborder\b")) or title_row
-
-def _li_text_with_inline_markers(li: Tag) -> str:
-    parts: List[str] = []
-    for node in li.children:
-        if isinstance(node, NavigableString):
-            parts.append(str(node))
-        elif isinstance(node, Tag):
-            if node.name == "img":
-                src = (node.get("src") or "").lower()
-                if PASSIVE_ARROW_UP in src:
-                    parts.append(" up")
-                elif PASSIVE_ARROW_DOWN in src:
-                    parts.append(" down")
-                elif PASSIVE_ICON_ONCE in src or PASSIVE_ICON_PERMA in src:
-                    continue
-                else:
-                    continue
-            else:
-                parts.append(node.get_text(" ", strip=False))
+    border = next((d for d in title_row.iterancestors("div") if _has_class_match(d, BORDER_CLASS_RE)), None)
+    return border if border is not None else title_row
+
+def _li_text_with_inline_markers(li) -> str:
+    parts: List[str] = [li.text or ""]
+    for node in li:
+        if not isinstance(node.tag, str):
+            # comments count as plain strings here, as they did under bs4
+            parts.append(node.text or "")
+        elif node.tag == "img":
+            src = (node.get("src") or "").lower()
+            if PASSIVE_ARROW_UP in src:
+                parts.append(" up")
+            elif PASSIVE_ARROW_DOWN in src:
+                parts.append(" down")
+        else:
+            parts.append(_el_text(node, " "))
+        parts.append(node.tail or "")
     return _condense_spaces("".join(parts))
 
-def _li_icons(li: Tag) -> Tuple[bool, bool, List[str], List[str]]:
+def _li_icons(li) -> Tuple[bool, bool, List[str], List[str]]:
     once = False
     permanent = False
     arrows: List[str] = []
     tokens: List[str] = []
-    for im in li.find_all("img"):
-        src = (im.get("src") or "").lower()
-        if PASSIVE_ICON_ONCE in src:
+    for im in li.iterdescendants("img"):
+        src = im.get("src") or ""
+        mk = PASSIVE_MARKER_RE.search(src)
+        if mk is None:
+            m = ICON_NAME_RE.search(src)
+            if m:
+                tokens.append(m.group(1).lower())
+        elif mk.group("icon") == "1":
             once = True
             tokens.append(PASSIVE_ICON_ONCE)
-        elif PASSIVE_ICON_PERMA in src:
+        elif mk.group("icon") == "2":
             permanent = True
             tokens.append(PASSIVE_ICON_PERMA)
-        elif PASSIVE_ARROW_UP in src:
+        elif mk.group("arrow") == "1":
             arrows.append("up")
             tokens.append(PASSIVE_ARROW_UP)
-        elif PASSIVE_ARROW_DOWN in src:
+        else:
             arrows.append("down")
             tokens.append(PASSIVE_ARROW_DOWN)
-        else:
-            m = re.search(r"/([a-z0-9_]+)\.(?:png|jpg|jpeg|gif|webp)$", src)
-            if m:
-                tokens.append(m.group(1))
     return once, permanent, arrows, tokens
 
-def parse_passive_lines_from_dom(soup: BeautifulSoup) -> Tuple[List[Dict[str, object]], str]:
-    content = _find_passive_content_div(soup)
-    if not content:
+def parse_passive_lines_from_dom(tree) -> Tuple[List[Dict[str, object]], str]:
+    content = _find_passive_content_div(tree) if tree is not None else None
+    if content is None:
         return [], ""
 
     lines: List[Dict[str, object]] = []
     current_context: Optional[str] = None
     in_basic_scope: bool = False
 
-    for child in content.descendants:
-        if isinstance(child, Tag):
-            if child.name in {"strong", "b"}:
-                txt = child.get_text(" ", strip=True)
-                if txt:
-                    if re.fullmatch(r"(?i)\s*basic effect\(s\)\s*", txt):
-                        in_basic_scope = True
-                        continue
-                    current_context = _condense_spaces(txt)
-                    in_basic_scope = False
-
-            if child.name == "li":
-                once, permanent, arrows, tokens = _li_icons(child)
-                text = _li_text_with_inline_markers(child)
-                if not text:
+    for child in content.iterdescendants("strong", "b", "li"):
+        if child.tag in {"strong", "b"}:
+            txt = _el_text(child, " ", strip=True)
+            if txt:
+                if BASIC_EFFECT_TITLE_RE.fullmatch(txt):
+                    in_basic_scope = True
                     continue
-                if not once and not permanent and in_basic_scope:
-                    permanent = True
-                ctx_join = f"{current_context or ''} {text}"
-                if not once and ENTRANCE_REGEX.search(ctx_join):
-                    once = True
-                lines.append({
-                    "text": text,
-                    "context": current_context,
-                    "once": once,
-                    "permanent": permanent,
-                    "arrows": arrows,
-                    "icons": tokens,
-                })
+                current_context = _condense_spaces(txt)
+                in_basic_scope = False
+
+        if child.tag == "li":
+            once, permanent, arrows, tokens = _li_icons(child)
+            text = _li_text_with_inline_markers(child)
+            if not text:
+                continue
+            if not once and not permanent and in_basic_scope:
+                permanent = True
+            ctx_join = f"{current_context or ''} {text}"
+            if not once and ENTRANCE_REGEX.search(ctx_join):
+                once = True
+            lines.append({
+                "text": text,
+                "context": current_context,
+                "once": once,
+                "permanent": permanent,
+                "arrows": arrows,
+                "icons": tokens,
+            })
 
     parts: List[str] = []
     last_ctx = object()
@@ -704,9 +943,7 @@ def parse_passive_lines_from_dom(soup: BeautifulSoup) -> Tuple[List[Dict[str, ob
             parts.append(seg)
         else:
             parts.append(seg)
-    consolidated = "; ".join(parts)
-    consolidated = re.sub(r"\s*;\s*", "; ", consolidated).strip()
-    consolidated = re.sub(r"^\s*Basic effect\(s\):\s*", "", consolidated, flags=re.IGNORECASE)
+    consolidated = _strip_basic_effect_prefix(_join_clauses(parts))
     return lines, consolidated
 
 def render_passive_effect_with_markers(lines: List[Dict[str, object]]) -> str:
@@ -721,32 +958,20 @@ def render_passive_effect_with_markers(lines: List[Dict[str, object]]) -> str:
                 seg = f"{ctx}: {seg}"
             last_ctx = ctx
         rendered.append(seg)
-    return re.sub(r"\s*;\s*", "; ", "; ".join(rendered)).strip()
+    return _join_clauses(rendered)
 
 # ---------- Passive fallback ----------
 
 def _group_passive_lines_fallback(lines: List[str]) -> str:
     if not lines:
         return ""
-    lines = [ln for ln in lines if ln not in HEADERS and not re.fullmatch(r"Basic effect\(s\):?", ln, flags=re.IGNORECASE)]
+    lines = [ln for ln in lines if ln not in HEADERS_SET and not BASIC_EFFECT_LINE_RE.fullmatch(ln)]
     activ_idx = next((i for i, ln in enumerate(lines) if ln.lower().startswith("activates the entrance animation")), None)
     if activ_idx is not None and activ_idx != 0:
         first = lines.pop(activ_idx)
         lines.insert(0, first)
-    leading_patterns = [
-        r"^Activates the Entrance Animation",
-        r"^Ki \+\d",
-        r"^ATK",
-        r"^DEF",
-        r"^Guards all attacks",
-        r"^For every attack performed",
-        r"^For every attack received",
-        r"^Launches an additional attack",
-        r"^For every Super Attack the enemy launches",
-        r"^When receiving an Unarmed Super Attack",
-    ]
     def is_leading(s: str) -> bool:
-        return any(re.search(p, s, flags=re.IGNORECASE) for p in leading_patterns)
+        return LEADING_RE.search(s) is not None
 
     groups: List[List[str]] = []
     cur: List[str] = []
@@ -760,17 +985,14 @@ def _group_passive_lines_fallback(lines: List[str]) -> str:
         groups.append(cur)
     out_parts: List[str] = []
     for g in groups:
-        g = [x for x in g if x and x not in HEADERS and not re.fullmatch(r"Basic effect\(s\):?", x, flags=re.IGNORECASE)]
+        g = [x for x in g if x and x not in HEADERS_SET and not BASIC_EFFECT_LINE_RE.fullmatch(x)]
         if not g:
             continue
         clause = _condense_spaces(" ".join(g))
-        clause = re.sub(r"^\s*Basic effect\(s\):\s*", "", clause, flags=re.IGNORECASE)
-        clause = re.sub(r"^(For every [^.]+?)(?!:)\s", r"\1: ", clause, flags=re.IGNORECASE)
+        clause = BASIC_EFFECT_PREFIX_RE.sub("", clause)
+        clause = FOR_EVERY_COLON_RE.sub(r"\1: ", clause)
         out_parts.append(clause)
-    effect = "; ".join(out_parts)
-    effect = re.sub(r"\s*;\s*", "; ", effect).strip()
-    effect = re.sub(r"^\s*Basic effect\(s\):\s*", "", effect, flags=re.IGNORECASE)
-    return effect
+    return _strip_basic_effect_prefix(_join_clauses(out_parts))
 
 # ------------ Active/Activation/Categories/Stats/Release -------------
 
@@ -780,7 +1002,7 @@ def _clean_active(block: List[str]) -> Tuple[Optional[str], Optional[str]]:
     name = block[0]
     body = []
     for ln in block[1:]:
-        if ln in HEADERS or re.fullmatch(r"Link Skills", ln, re.IGNORECASE):
+        if ln in HEADERS_SET or LINK_SKILLS_RE.fullmatch(ln):
             break
         body.append(ln)
     effect = _condense_spaces("; ".join([_condense_spaces(b) for b in body if b]))
@@ -804,21 +1026,55 @@ def _clean_links(block: List[str]) -> List[str]:
         seen.add(s); out.append(s)
     return out
 
-def _parse_stats_textual(block: List[str], page_text: str) -> Dict[str, object]:
+def _ci_search(pattern: re.Pattern, text: str, low: Optional[str], literal: str) -> Optional[re.Match]:
+    """
+    pattern.search(text) for an IGNORECASE pattern whose every match starts with `literal` (lowercase).
+    `low` is text.lower(), computed once by the caller: an absent literal skips the regex outright, and
+    otherwise the search starts at its first occurrence instead of case-folding the whole page.
+    """
+    if low is None:
+        return pattern.search(text)
+    i = low.find(literal)
+    if i < 0:
+        return None
+    # str.lower() can change the length of a few exotic characters; offsets are only valid if it didn't
+    return pattern.search(text, i if len(low) == len(text) else 0)
+
+def _parse_stats_textual(block: List[str], page_text: str, page_text_low: Optional[str] = None) -> Dict[str, object]:
     stats: Dict[str, object] = {}
-    m_cost = re.search(r"\bCost\s*:\s*(\d+)", page_text, flags=re.IGNORECASE)
+    m_cost = _ci_search(COST_RE, page_text, page_text_low, "cost")
     if m_cost: stats["Cost"] = int(m_cost.group(1))
-    m_max = re.search(r"\bMax\s*Lv\s*:\s*(\d+)", page_text, flags=re.IGNORECASE)
+    m_max = _ci_search(MAX_LV_RE, page_text, page_text_low, "max")
     if m_max: stats["Max Lv"] = int(m_max.group(1))
-    m_sa = re.search(r"\bSA\s*Lv\s*:\s*(\d+)", page_text, flags=re.IGNORECASE)
+    m_sa = _ci_search(SA_LV_VALUE_RE, page_text, page_text_low, "sa")
     if m_sa: stats["SA Lv"] = int(m_sa.group(1))
     return stats
 
+# table header -> record key; unknown headers pass through unchanged
+STATS_HEADER_KEYS = {
+    "Base Min": "Base Min",
+    "Base Max": "Base Max",
+    "55%": "55%",
+    "100%": "100%",
+    "EZA B. Max": "EZA B. Max",
+    "EZA 100%": "EZA 100%",
+}
+STATS_ROW_NAMES = frozenset({"HP", "ATK", "DEF"})
+STAT_CELL_TRANS = str.maketrans("", "", ",")
+
+def _tag_text(tag) -> str:
+    """tag.get_text(strip=True), reading .string directly when the tag holds a single plain text node."""
+    s = tag.string
+    if type(s) is NavigableString:
+        return s.strip()
+    return tag.get_text(strip=True)
+
 def _parse_stats_table_dom(soup: BeautifulSoup) -> Dict[str, object]:
     out: Dict[str, object] = {}
     table = None
     for th in soup.find_all("th"):
-        if th.find("b") and th.find("b").get_text(strip=True).lower() == "stats":
+        b = th.find("b")
+        if b and b.get_text(strip=True).lower() == "stats":
             tbl = th.find_parent("table")
             if tbl:
                 table = tbl
@@ -828,31 +1084,18 @@ def _parse_stats_table_dom(soup: BeautifulSoup) -> Dict[str, object]:
     header_row = table.find("tr")
     if not header_row:
         return out
-    headers = []
-    for th in header_row.find_all("th")[1:]:
-        headers.append(th.get_text(strip=True))
-    key_map = {
-        "Base Min": "Base Min",
-        "Base Max": "Base Max",
-        "55%": "55%",
-        "100%": "100%",
-        "EZA B. Max": "EZA B. Max",
-        "EZA 100%": "EZA 100%",
-    }
-    norm_headers = [key_map.get(h, h) for h in headers]
+    norm_headers = [STATS_HEADER_KEYS.get(h, h) for h in (th.get_text(strip=True) for th in header_row.find_all("th")[1:])]
     for row in table.find_all("tr")[1:]:
         stat_name_th = row.find("th")
         if not stat_name_th:
             continue
         stat_name = stat_name_th.get_text(strip=True).upper()
-        if stat_name not in {"HP", "ATK", "DEF"}:
+        if stat_name not in STATS_ROW_NAMES:
             continue
-        cells = [td.get_text(strip=True).replace(",", "") for td in row.find_all("td")]
+        cells = [_tag_text(td).translate(STAT_CELL_TRANS) for td in row.find_all("td")]
         values: Dict[str, int] = {}
-        for i, val in enumerate(cells):
-            if i >= len(norm_headers):
-                break
-            hkey = norm_headers[i]
+        # zip stops at the shorter side, as the old index check did
+        for hkey, val in zip(norm_headers, cells):
             if not val:
                 continue
             try:
@@ -863,41 +1106,56 @@ def _parse_stats_table_dom(soup: BeautifulSoup) -> Dict[str, object]:
             out[stat_name] = values
     return out
 
-def _parse_release(page_text: str) -> Tuple[Optional[str], Optional[str]]:
-    m = re.search(
-        r"Release Date\s+([0-9/.\-]+)\s+([0-9: ]+[APMapm]{2})\s+([A-Z]{2,4})",
-        page_text,
-        flags=re.IGNORECASE,
-    )
+RELEASE_RE = re.compile(r"Release Date\s+([0-9/.\-]+)\s+([0-9: ]+[APMapm]{2})\s+([A-Z]{2,4})", re.IGNORECASE)
+DT_TZ_RE = re.compile(r"([0-9/.\-]+\s+[0-9: ]+[APMapm]{2})\s+([A-Z]{2,4})")
+
+def _index_b_nodes(tree) -> Dict[str, list]:
+    """One pass over every <b>, keyed by its lowercased, stripped bs4-style .string."""
+    index: Dict[str, list] = {}
+    if tree is None:
+        return index
+    for b in tree.iter("b"):
+        s = _el_string(b)
+        if s is None:
+            continue
+        index.setdefault(s.strip().lower(), []).append(b)
+    return index
+
+def _ancestor_div(el, pattern: re.Pattern):
+    return next((d for d in el.iterancestors("div") if _has_class_match(d, pattern)), None)
+
+def _parse_release(page_text: str, page_text_low: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    m = _ci_search(RELEASE_RE, page_text, page_text_low, "release date")
     if m:
         return f"{m.group(1)} {m.group(2)}", m.group(3)
     return None, None
 
-def _parse_release_dom(soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+def _parse_release_dom(tree, b_index: Optional[Dict[str, list]] = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    if b_index is None:
+        b_index = _index_b_nodes(tree)
+
     def grab_block(b_label: str) -> Optional[str]:
-        b = soup.find("b", string=re.compile(r"^\s*{0}\s*$".format(re.escape(b_label)), re.IGNORECASE))
-        if not b:
+        bs = b_index.get(b_label)
+        if not bs:
             return None
-        row = b.find_parent("div", class_=re.compile(r"\brow\b"))
-        if not row:
+        row = _ancestor_div(bs[0], ROW_CLASS_RE)
+        if row is None:
             return None
-        nxt = row.find_next_sibling("div")
-        hops = 0
-        while nxt and hops < 3:
-            text = nxt.get_text("\n", strip=True)
+        for hops, nxt in enumerate(row.itersiblings("div")):
+            if hops >= 3:
+                break
+            text = _el_text(nxt, "\n", strip=True)
             if text:
                 return _condense_spaces(text.replace("\n", " "))
-            nxt = nxt.find_next_sibling("div")
-            hops += 1
         return None
 
-    rd_text = grab_block("Release Date")
-    eza_rd_text = grab_block("EZA Release Date")
+    rd_text = grab_block("release date")
+    eza_rd_text = grab_block("eza release date")
 
     def split_dt_tz(txt: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
         if not txt:
             return None, None
-        m = re.search(r"([0-9/.\-]+\s+[0-9: ]+[APMapm]{2})\s+([A-Z]{2,4})", txt)
+        m = DT_TZ_RE.search(txt)
         if m:
             return m.group(1), m.group(2)
         return txt, None
@@ -906,41 +1164,51 @@ def _parse_release_dom(soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str
     eza_rel_dt, _ = split_dt_tz(eza_rd_text)
     return rel_dt, rel_tz, eza_rel_dt
 
-def parse_categories_from_soup(soup: BeautifulSoup) -> List[str]:
-    cats1 = [(im.get("alt") or im.get("title") or "") for im in soup.select('a[href*="/categories/"] img')]
+CATEGORY_LINK_IMG_XPATH = '//a[contains(@href, "/categories/")]//img'
+CATEGORY_LABEL_IMG_XPATH = '//img[contains(@src, "/card_category/label/")]'
+# prefilter only; the exact strip() == "Categories" test is done in Python
+CATEGORIES_TEXT_XPATH = '//text()[contains(., "Categories")]'
+
+def _categories_heading(tree):
+    for t in tree.xpath(CATEGORIES_TEXT_XPATH):
+        if str(t).strip() == "Categories":
+            parent = t.getparent()
+            return parent.getparent() if t.is_tail else parent
+    return None
+
+def parse_categories_from_tree(tree) -> List[str]:
+    if tree is None:
+        return []
+    cats1 = [(im.get("alt") or im.get("title") or "") for im in tree.xpath(CATEGORY_LINK_IMG_XPATH)]
     cats1 = [c for c in cats1 if c]
-    cats2 = [(im.get("alt") or im.get("title") or "") for im in soup.select('img[src*="/card_category/label/"]')]
+    cats2 = [(im.get("alt") or im.get("title") or "") for im in tree.xpath(CATEGORY_LABEL_IMG_XPATH)]
     cats2 = [c for c in cats2 if c]
     cats3 = []
-    cat_el: Optional[Tag] = None
-    for el in soup.find_all(string=True):
-        if isinstance(el, NavigableString) and str(el).strip() == "Categories":
-            cat_el = el.parent if isinstance(el.parent, Tag) else None
-            if cat_el:
-                break
-    if cat_el:
-        for sib in cat_el.next_siblings:
-            if isinstance(sib, NavigableString):
-                txt = str(sib).strip()
-                if txt in HEADERS:
+    cat_el = _categories_heading(tree)
+    if cat_el is not None:
+        if (cat_el.tail or "").strip() not in HEADERS_SET:
+            for sib in cat_el.itersiblings():
+                if not isinstance(sib.tag, str):
+                    # comments are plain strings to the heading walk
+                    if (sib.text or "").strip() in HEADERS_SET:
+                        break
+                elif _el_text(sib, strip=True) in HEADERS_SET:
                     break
-                continue
-            if isinstance(sib, Tag):
-                txt = sib.get_text(strip=True)
-                if txt in HEADERS:
+                else:
+                    for im in sib.iterdescendants("img"):
+                        src = im.get("src") or ""
+                        if "/card_category/label/" in src:
+                            lab = im.get("alt") or im.get("title") or ""
+                            if lab:
+                                cats3.append(lab)
+                    for a in sib.iterdescendants("a"):
+                        href = a.get("href") or ""
+                        if "/categories/" in href:
+                            t = _el_text(a, strip=True)
+                            if t:
+                                cats3.append(t)
+                if (sib.tail or "").strip() in HEADERS_SET:
                     break
-                for im in sib.find_all("img"):
-                    src = im.get("src") or ""
-                    if "/card_category/label/" in src:
-                        lab = im.get("alt") or im.get("title") or ""
-                        if lab:
-                            cats3.append(lab)
-                for a in sib.find_all("a"):
-                    href = a.get("href") or ""
-                    if "/categories/" in href:
-                        t = a.get_text(strip=True)
-                        if t:
-                            cats3.append(t)
     merged = []
     seen = set()
     for pool in (cats1, cats2, cats3):
@@ -950,34 +1218,43 @@ def parse_categories_from_soup(soup: BeautifulSoup) -> List[str]:
                 seen.add(s); merged.append(s)
     return _clean_categories_python(merged)
 
+# one fullmatch for the pattern rejects: numbers/percentages, "Links:"/"Show More" chrome, image file names
+CATEGORY_REJECT_RE = re.compile(
+    r"[\d\s%:]+"
+    r"|.*(?:Links:|Show More).*"
+    r"|.*\.(?i:png|jpg|jpeg|gif|webp)\n?",
+    re.DOTALL,
+)
+
 def _clean_categories_python(cats: List[str]) -> List[str]:
     out = []
     seen = set()
     for s in cats or []:
         s = (s or "").strip().strip("•· ")
-        if not s: continue
-        low = s.lower()
-        if low in CATEGORY_BLACKLIST_TOKENS: continue
-        if EXT_FILE_PATTERN.search(s): continue
-        if re.fullmatch(r"[\d\s%:]+", s): continue
-        if s in HEADERS or "Links:" in s or "Show More" in s: continue
-        if s in seen: continue
+        if not s or s in seen or s in HEADERS_SET: continue
+        if s.lower() in CATEGORY_BLACKLIST_TOKENS or CATEGORY_REJECT_RE.fullmatch(s): continue
         seen.add(s); out.append(s)
     return out
 
 # ------------ Rarity, Type, Obtain Type -------------
 
-def detect_rarity_from_dom(soup: BeautifulSoup, image_urls_fallback: List[str]) -> Optional[str]:
+RARITY_SRC_RE = re.compile(r"cha_rare(?:_sm)?_(lr|ur|ssr|sr|r|n)\.png")
+
+RARITY_ICON_XPATH = "(//div[{}]//img[@src])[1]".format(
+    _xp_class("card-icon-item", "card-icon-item-rarity", "card-info-above-thumb")
+)
+
+def detect_rarity_from_dom(tree, image_urls_fallback: List[str]) -> Optional[str]:
     rarity_map = {"lr": "LR", "ur": "UR", "ssr": "SSR", "sr": "SR", "r": "R", "n": "N"}
-    node = soup.select_one("div.card-icon-item.card-icon-item-rarity.card-info-above-thumb img[src]")
+    node = tree.xpath(RARITY_ICON_XPATH) if tree is not None else []
     if node:
-        src = (node.get("src") or "").lower()
-        m = re.search(r"cha_rare(?:_sm)?_(lr|ur|ssr|sr|r|n)\.png", src)
+        src = (node[0].get("src") or "").lower()
+        m = RARITY_SRC_RE.search(src)
         if m:
             return rarity_map.get(m.group(1).lower())
     for url in image_urls_fallback or []:
         low = url.lower()
-        m = re.search(r"cha_rare(?:_sm)?_(lr|ur|ssr|sr|r|n)\.png", low)
+        m = RARITY_SRC_RE.search(low)
         if m:
             return rarity_map.get(m.group(1).lower())
     return None
@@ -986,26 +1263,23 @@ def detect_type_token_from_dom(soup: BeautifulSoup) -> Optional[str]:
     candidates = soup.select("div.row.justify-content-center.align-items-center.padding-top-bottom-10.border.border-2")
     if not candidates:
         return None
-    cls_list = candidates[0].get("class") or []
-    type_found = None
-    for cls in cls_list:
-        if cls.startswith("border-") or cls.startswith("bg-"):
-            suffix = cls.split("-", 1)[-1].strip().lower()
-            if suffix in TYPE_SET:
-                type_found = suffix
-    return type_found
-
-def parse_obtain_type(soup: BeautifulSoup) -> Optional[str]:
-    for div in soup.find_all("div", class_=re.compile(r"\brow\b")):
-        cls = " ".join(div.get("class") or [])
-        if "padding-top-bottom-10" in cls:
-            txt = div.get_text(" ", strip=True)
-            if "Summonable" in txt:
-                return "Summonable"
+    return detect_type_suffix_from_classes(candidates[0].get("class") or [])
+
+# string-value prefilter in C; the row-class and get_text checks below keep the exact semantics
+OBTAIN_ROW_XPATH = '//div[contains(@class, "padding-top-bottom-10") and contains(., "Summonable")]'
+
+def parse_obtain_type(tree) -> Optional[str]:
+    if tree is None:
+        return None
+    for div in tree.xpath(OBTAIN_ROW_XPATH):
+        if _has_class_match(div, ROW_CLASS_RE) and "Summonable" in _el_text(div, " ", strip=True):
+            return "Summonable"
     return None
 
 # ------------ Passive extras (transform/exchange) -------------
 
+TRANSFORM_RE = re.compile(r"\btransforms?\b|transformation")
+
 def extract_transform_and_exchange(passive_effect: str) -> Tuple[str, Dict[str, Optional[str]], Dict[str, Optional[str]]]:
     """
     Preserve full 'Reversible Exchange' clause for the exchange condition.
@@ -1014,7 +1288,12 @@ def extract_transform_and_exchange(passive_effect: str) -> Tuple[str, Dict[str,
     if not passive_effect:
         return passive_effect, {"can_transform": False, "condition": None}, {"can_exchange": False, "condition": None}
 
-    clauses = [c.strip() for c in re.split(r"\s*;\s*", passive_effect) if c.strip()]
+    clauses = [c for c in (c.strip() for c in passive_effect.split(";")) if c]
+    low_all = passive_effect.lower()
+    if "transform" not in low_all and "reversible exchange" not in low_all:
+        # most passives have neither; skip the per-clause scan
+        return "; ".join(clauses), {"can_transform": False, "condition": None}, {"can_exchange": False, "condition": None}
+
     keep: List[str] = []
     transform_clauses: List[str] = []
     exchange_clauses: List[str] = []
@@ -1024,7 +1303,7 @@ def extract_transform_and_exchange(passive_effect: str) -> Tuple[str, Dict[str,
         if "reversible exchange" in low:
             exchange_clauses.append(c)
             continue
-        if re.search(r"\btransforms?\b", low) or "transformation" in low:
+        if TRANSFORM_RE.search(low):
             transform_clauses.append(c)
             continue
         keep.append(c)
@@ -1045,34 +1324,45 @@ def extract_transform_and_exchange(passive_effect: str) -> Tuple[str, Dict[str,
 
 # ------------ Domains / Standby / Finish -------------
 
+TYPE_CLASS_PREFIXES = ("border-", "bg-")
+
 def detect_type_suffix_from_classes(cls_list: List[str]) -> Optional[str]:
-    t = None
-    for cls in cls_list or []:
-        if cls.startswith("border-") or cls.startswith("bg-"):
-            suf = cls.split("-", 1)[-1].strip().lower()
+    # last matching class wins
+    for cls in reversed(cls_list or []):
+        if cls.startswith(TYPE_CLASS_PREFIXES):
+            suf = cls.partition("-")[2].strip().lower()
             if suf in TYPE_SET:
-                t = suf
-    return t
+                return suf
+    return None
+
+BG2_CLASS_RE = re.compile(r"\bbg-.*-2\b")
+# matched against _condense_spaces() output, so single spaces suffice
+SKILL_CONDITION_LABELS = ("standby skill condition(s)", "finish skill condition(s)")
 
-def parse_domains(soup: BeautifulSoup) -> List[Dict[str, Optional[str]]]:
+@lru_cache(maxsize=32)
+def _cond_label_pattern(cond_label: str) -> re.Pattern:
+    return re.compile(rf"\b{re.escape(cond_label)}\b", re.IGNORECASE)
+
+def parse_domains(tree, b_index: Optional[Dict[str, list]] = None) -> List[Dict[str, Optional[str]]]:
+    if b_index is None:
+        b_index = _index_b_nodes(tree)
     domains: List[Dict[str, Optional[str]]] = []
-    for bnode in soup.find_all("b", string=re.compile(r"^\s*Domain Effect\(s\)\s*$", re.IGNORECASE)):
-        outer_row = bnode.find_parent("div", class_=re.compile(r"\brow\b"))
-        if not outer_row: continue
-        bolds = outer_row.find_all("b")
-        domain_name = bolds[1].get_text(strip=True) if len(bolds) >= 2 else None
-        container = outer_row.find_parent("div", class_=re.compile(r"\bborder\b"))
-        type_suffix = detect_type_suffix_from_classes(container.get("class") or []) if container else None
+    for bnode in b_index.get("domain effect(s)", []):
+        outer_row = _ancestor_div(bnode, ROW_CLASS_RE)
+        if outer_row is None: continue
+        bolds = list(outer_row.iterdescendants("b"))
+        domain_name = _el_text(bolds[1], strip=True) if len(bolds) >= 2 else None
+        container = _ancestor_div(outer_row, BORDER_CLASS_RE)
+        type_suffix = detect_type_suffix_from_classes((container.get("class") or "").split()) if container is not None else None
         effect_text = None
-        effect_row = outer_row.find_next_sibling("div")
-        hops = 0
-        while effect_row and hops < 3 and not effect_text:
-            if effect_row.get("class") and any(c.startswith("bg-") and c.endswith("-2") for c in effect_row.get("class")):
-                effect_text = effect_row.get_text(" ", strip=True); break
-            deep = effect_row.find("div", class_=re.compile(r"\bbg-.*-2\b"))
-            if deep:
-                effect_text = deep.get_text(" ", strip=True); break
-            effect_row = effect_row.find_next_sibling("div"); hops += 1
+        for hops, effect_row in enumerate(outer_row.itersiblings("div")):
+            if hops >= 3:
+                break
+            if any(c.startswith("bg-") and c.endswith("-2") for c in (effect_row.get("class") or "").split()):
+                effect_text = _el_text(effect_row, " ", strip=True); break
+            deep = next((d for d in effect_row.iterdescendants("div") if _has_class_match(d, BG2_CLASS_RE)), None)
+            if deep is not None:
+                effect_text = _el_text(deep, " ", strip=True); break
         domains.append({"name": domain_name, "effect": effect_text, "type": (type_suffix.upper() if type_suffix else None)})
     seen = set(); uniq = []
     for d in domains:
@@ -1081,59 +1371,96 @@ def parse_domains(soup: BeautifulSoup) -> List[Dict[str, Optional[str]]]:
         seen.add(key); uniq.append(d)
     return uniq
 
-def collect_effect_and_conditions(content_div: Tag, cond_label_regex: re.Pattern) -> Tuple[str, Optional[str]]:
-    if not content_div:
+def collect_effect_and_conditions(content_div, cond_label_regex: re.Pattern) -> Tuple[str, Optional[str]]:
+    if content_div is None:
         return "", None
     effect_lines: List[str] = []; cond_lines: List[str] = []; collecting_conditions = False
-    for node in content_div.descendants:
-        if isinstance(node, Tag) and node.name == "b" and node.string and cond_label_regex.search(node.string.strip()):
-            collecting_conditions = True; continue
-        if isinstance(node, Tag) and node.name == "hr":
-            continue
-        if isinstance(node, NavigableString):
-            text = str(node).strip()
-            if not text: continue
+
+    def add(text: Optional[str]) -> None:
+        text = (text or "").strip()
+        if text:
             (cond_lines if collecting_conditions else effect_lines).append(text)
+
+    # every string under content_div in document order (comments included, as bs4 .descendants does)
+    for event, el in etree.iterwalk(content_div, events=("start", "end", "comment")):
+        if event == "start":
+            if el.tag == "b":
+                label = _el_string(el)
+                if label and cond_label_regex.search(label.strip()):
+                    collecting_conditions = True
+            add(el.text)
+        elif event == "comment":
+            add(el.text)
+            add(el.tail)
+        elif el is not content_div:
+            add(el.tail)
     effect = _condense_spaces(" ".join(effect_lines))
-    effect = re.sub(r"(Standby|Finish)\s+Skill\s+Condition\(s\)\s*$", "", effect, flags=re.IGNORECASE).strip()
+    effect_low = effect.lower()
+    for label in SKILL_CONDITION_LABELS:
+        if effect_low.endswith(label):
+            effect = effect[:-len(label)].strip()
+            break
     condition = _condense_spaces(" ".join(cond_lines)) if cond_lines else None
     if condition:
-        condition = re.sub(r"^(Standby|Finish)\s+Skill\s+Condition\(s\)\s*", "", condition, flags=re.IGNORECASE).strip()
-    effect = re.sub(r"\s*;\s*", "; ", effect)
+        condition_low = condition.lower()
+        for label in SKILL_CONDITION_LABELS:
+            if condition_low.startswith(label):
+                condition = condition[len(label):].strip()
+                break
+    # effect is already stripped, so stripping each piece is exactly SEMI_RE.sub("; ", effect)
+    effect = "; ".join(c.strip() for c in effect.split(";"))
     return effect, (condition or None)
 
-def parse_skill_blocks(soup: BeautifulSoup, header_label: str, cond_label: str) -> List[Dict[str, Optional[str]]]:
+def parse_skill_blocks(tree, header_label: str, cond_label: str,
+                       b_index: Optional[Dict[str, list]] = None) -> List[Dict[str, Optional[str]]]:
     results: List[Dict[str, Optional[str]]]= []
-    bnodes = soup.find_all("b", string=re.compile(rf"^\s*{re.escape(header_label)}\s*$", re.IGNORECASE))
-    for bnode in bnodes:
-        title_row = bnode.find_parent("div", class_=re.compile(r"\brow\b"))
-        if not title_row: continue
-        bolds = title_row.find_all("b")
-        skill_name = bolds[1].get_text(strip=True) if len(bolds) >= 2 else None
-        content_row = title_row.find_next_sibling("div")
+    if b_index is None:
+        b_index = _index_b_nodes(tree)
+    cond_re = _cond_label_pattern(cond_label)
+    for bnode in b_index.get(header_label.lower(), []):
+        title_row = _ancestor_div(bnode, ROW_CLASS_RE)
+        if title_row is None: continue
+        bolds = list(title_row.iterdescendants("b"))
+        skill_name = _el_text(bolds[1], strip=True) if len(bolds) >= 2 else None
+        sibs = title_row.itersiblings("div")
+        content_row = next(sibs, None)
         hops = 0
-        while content_row and hops < 5:
-            cls = content_row.get("class") or []
-            if any(c.startswith("bg-") and (c.endswith("-2") or c in TYPE_SET) for c in cls) or content_row.find("div", class_=re.compile(r"\bbg-.*-2\b")):
+        while content_row is not None and hops < 5:
+            cls = (content_row.get("class") or "").split()
+            if any(c.startswith("bg-") and (c.endswith("-2") or c in TYPE_SET) for c in cls) or any(_has_class_match(d, BG2_CLASS_RE) for d in content_row.iterdescendants("div")):
                 break
-            content_row = content_row.find_next_sibling("div"); hops += 1
-        container = title_row.find_parent("div", class_=re.compile(r"\bborder\b"))
-        type_suffix = detect_type_suffix_from_classes(container.get("class") or []) if container else None
+            content_row = next(sibs, None); hops += 1
+        container = _ancestor_div(title_row, BORDER_CLASS_RE)
+        type_suffix = detect_type_suffix_from_classes((container.get("class") or "").split()) if container is not None else None
         type_upper = type_suffix.upper() if type_suffix else None
-        effect, conditions = collect_effect_and_conditions(content_row or title_row, re.compile(rf"\b{re.escape(cond_label)}\b", re.IGNORECASE))
+        effect, conditions = collect_effect_and_conditions(content_row if content_row is not None else title_row, cond_re)
         results.append({"name": skill_name, "effect": effect or None, "conditions": conditions, "type": type_upper})
     return results
 
-def parse_standby_skill(soup: BeautifulSoup) -> Optional[Dict[str, Optional[str]]]:
-    blocks = parse_skill_blocks(soup, header_label="Standby Skill", cond_label="Standby Condition(s)")
+def parse_standby_skill(tree, b_index: Optional[Dict[str, list]] = None) -> Optional[Dict[str, Optional[str]]]:
+    blocks = parse_skill_blocks(tree, header_label="Standby Skill", cond_label="Standby Condition(s)", b_index=b_index)
     if not blocks: return None
     return max(blocks, key=lambda b: len(b.get("effect") or ""))
 
-def parse_finish_skills(soup: BeautifulSoup) -> List[Dict[str, Optional[str]]]:
-    return parse_skill_blocks(soup, header_label="Finish Skill", cond_label="Finish Skill Condition(s)")
+def parse_finish_skills(tree, b_index: Optional[Dict[str, list]] = None) -> List[Dict[str, Optional[str]]]:
+    return parse_skill_blocks(tree, header_label="Finish Skill", cond_label="Finish Skill Condition(s)", b_index=b_index)
 
 # ------------ EZA detection -------------
 
+def has_eza_toggle(soup: BeautifulSoup) -> bool:
+    """PRE-EZA and EZA toggle labels, found in a single pass over the <b> tags."""
+    labels = {b.string.strip().upper() for b in soup.find_all("b") if b.string is not None}
+    return "PRE-EZA" in labels and "EZA" in labels
+
+def has_eza_stats_headers(soup: BeautifulSoup) -> bool:
+    """True if the Stats table shows EZA columns."""
+    for th in soup.find_all("th"):
+        txt = (th.get_text(" ", strip=True) or "").upper()
+        # Typical headers we already map in _parse_stats_table_dom
+        if "EZA" in txt or "EZA B." in txt or "EZA 100%" in txt:
+            return True
+    return False
+
 def discover_eza_steps_on_page_soup(soup: Optional[BeautifulSoup], rarity_hint: Optional[str]) -> Tuple[List[int], Optional[int]]:
     """
     UI-driven EZA detection on the current page:
@@ -1143,11 +1470,7 @@ def discover_eza_steps_on_page_soup(soup: Optional[BeautifulSoup], rarity_hint:
     """
     if not soup:
         return [], None
-    has_toggle = bool(
-        soup.find("b", string=lambda s: isinstance(s, str) and s.strip().upper() == "PRE-EZA") and
-        soup.find("b", string=lambda s: isinstance(s, str) and s.strip().upper() == "EZA")
-    )
-    if not (has_eza_dropdown(soup) or has_toggle):
+    if not (has_eza_dropdown(soup) or has_eza_toggle(soup)):
         return [], None
     steps = discover_eza_steps_with_fallback(soup, rarity_hint=rarity_hint)
     max_step = max(steps) if steps else None
@@ -1156,8 +1479,11 @@ def discover_eza_steps_on_page_soup(soup: Optional[BeautifulSoup], rarity_hint:
 
 def discover_eza_steps_from_dropdown(soup: BeautifulSoup) -> List[int]:
     steps: List[int] = []
+    # most pages have no dropdown at all; skip the deep selector for them
+    if soup.select_one("div.multiselect ul.multiselect__content") is None:
+        return steps
     for span in soup.select("div.multiselect ul.multiselect__content li.multiselect__element span.multiselect__option span"):
-        txt = (span.get_text(strip=True) or "").strip()
+        txt = _tag_text(span)
         if txt.isdigit():
             steps.append(int(txt))
     return sorted(set(steps))
@@ -1192,9 +1518,8 @@ def discover_eza_steps_with_fallback(soup: BeautifulSoup, rarity_hint: Optional[
     return list(range(1, cur + 1))
 
 # ------------ Assets downloader -------------
-EXT_FILE_PATTERN = re.compile(r"\.(png|jpg|jpeg|gif|webp)$", re.IGNORECASE)
-
-def _url_to_asset_rel(url: str) -> Optional[Path]:
+@lru_cache(maxsize=16384)
+def _url_to_asset_rel(url: str) -> Optional[str]:
     try:
         parsed = urlparse(url)
         if not parsed.scheme or not parsed.netloc:
@@ -1204,51 +1529,90 @@ def _url_to_asset_rel(url: str) -> Optional[Path]:
             return None
         if not EXT_FILE_PATTERN.search(parsed.path):
             return None
-        parts = [p for p in PurePosixPath(parsed.path).parts if p and p != "/"]
-        return Path(host, *parts)
+        # plain string split; Path objects are only built at the filesystem boundary
+        parts = [p for p in parsed.path.split("/") if p and p != "."]
+        return os.path.join(host, *parts)
     except Exception:
         return None
 
+def build_session() -> requests.Session:
+    """One keep-alive session for the whole run so asset fetches reuse pooled connections."""
+    sess = requests.Session()
+    sess.headers.update(REQUEST_HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    return sess
+
+SESSION = build_session()
+
+SMALL_ASSET_BYTES = 1 << 20     # known-small bodies are read and written in one go
+COPY_CHUNK_BYTES = 256 * 1024
+
+def _fetch_asset(url: str, target: Path) -> bool:
+    # several threads can fetch the same shared icon at once; write privately, then swap in
+    part = target.with_name(f"{target.name}.{threading.get_ident()}.part")
+    try:
+        with SESSION.get(url, stream=True, timeout=30) as r:
+            r.raise_for_status()
+            # a missing, malformed or repeated ("123, 123") length just takes the streaming path
+            length = str(r.headers.get("Content-Length") or "").strip()
+            size = int(length) if length.isdigit() else 0
+            with open(part, "wb") as f:
+                if 0 < size <= SMALL_ASSET_BYTES:
+                    f.write(r.content)
+                else:
+                    r.raw.decode_content = True
+                    shutil.copyfileobj(r.raw, f, COPY_CHUNK_BYTES)
+        os.replace(part, target)
+        return True
+    except Exception as e:
+        logging.warning("Asset failed: %s -> %s", url, e)
+        part.unlink(missing_ok=True)
+        return False
+
 def download_assets_for_card(image_urls: List[str]) -> List[str]:
     ASSETS_ROOT.mkdir(parents=True, exist_ok=True)
-    rel_paths: List[str] = []
+    # one pass: dedupe, skip what is already on disk, queue the rest
+    wanted: List[Tuple[str, bool]] = []
+    to_fetch: Dict[str, Tuple[str, Path]] = {}
     seen_rel: Set[str] = set()
 
-    sess = requests.Session()
-    sess.headers.update(REQUEST_HEADERS)
-
     for u in image_urls or []:
-        rel = _url_to_asset_rel(u)
-        if rel is None:
+        rel_str = _url_to_asset_rel(u)
+        if rel_str is None:
             continue
-        rel_str = str(rel)
         if rel_str in seen_rel:
             continue
         seen_rel.add(rel_str)
 
-        target = ASSETS_ROOT / rel
-        target.parent.mkdir(parents=True, exist_ok=True)
-
+        target = ASSETS_ROOT / rel_str
         if target.exists() and target.stat().st_size > 0:
-            rel_paths.append(rel_str)
+            wanted.append((rel_str, True))
             continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        wanted.append((rel_str, False))
+        to_fetch[rel_str] = (u, target)
 
-        try:
-            with sess.get(u, stream=True, timeout=30) as r:
-                r.raise_for_status()
-                with open(target, "wb") as f:
-                    for chunk in r.iter_content(65536):
-                        if chunk:
-                            f.write(chunk)
-            rel_paths.append(rel_str)
-        except Exception as e:
-            logging.warning("Asset failed: %s -> %s", u, e)
+    fetched: Set[str] = set()
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(ASSET_WORKERS, len(to_fetch))) as ex:
+            futures = {ex.submit(_fetch_asset, u, target): rel_str for rel_str, (u, target) in to_fetch.items()}
+            for fut, rel_str in futures.items():
+                if fut.result():
+                    fetched.add(rel_str)
 
-    return rel_paths
+    # keep page order regardless of which download finished first
+    return [rel_str for rel_str, present in wanted if present or rel_str in fetched]
 
 # ------------ NEW: Asset classification -------------
 CARD_FILE_ID_RE = re.compile(r"/card/(\d+)/", re.IGNORECASE)
 LOCALE_RE = re.compile(r"/(en|jp|kr|tw|cn)/", re.IGNORECASE)
+CATEGORY_LABEL_RE = re.compile(r"card_category_label_(\d+)_")
 
 def _extract_card_id_from_rel(rel: str) -> Optional[str]:
     p = rel.replace("\\", "/")
@@ -1263,82 +1627,93 @@ def _extract_locale_from_rel(rel: str) -> Optional[str]:
     m = LOCALE_RE.search(p)
     return m.group(1).lower() if m else None
 
+# Rule tables for classify_single_asset: (needle, rule) substring checks, first hit wins,
+# so declaration order is priority order (same as the old if/elif chain).
+ASSET_RULES = (
+    ("dokkan-info-logo", "logo"),
+    ("cha_rare_", "rarity_icon"),
+    ("/cha_type_icon_", "type_icon"),
+    ("/character_thumb_bg/", "thumb_bg"),
+    ("/ingame/battle/skill_dialog/", "passive_mark"),
+    ("/ingame/common/condition/st_", "condition_icon"),
+    ("/charamenu/dokkan/", "menu_icon"),
+    ("/card_category/label/", "category_label"),
+    ("/ingame/events/", "event_banner"),
+    ("/item/equipment/", "equipment"),
+    ("/character/thumb/", "thumbnail"),
+    ("/character/card/", "card_art"),
+)
+CARD_ART_SUBTYPES = (
+    ("_bg.", "bg"),
+    ("_character.", "character"),
+    ("_circle.", "circle"),
+    ("_effect.", "effect"),
+    ("cutin", "cutin"),
+    ("_sp02_name.", "super_name_alt"),
+    ("_sp02_phrase.", "super_phrase_alt"),
+    ("_sp_name.", "super_name"),
+    ("_sp_phrase.", "super_phrase"),
+)
+UI_ASSET_RULES = frozenset({"rarity_icon", "type_icon", "thumb_bg", "passive_mark", "condition_icon", "menu_icon"})
+
+def _first_rule(rules: Tuple[Tuple[str, str], ...], text: str) -> Optional[str]:
+    for needle, rule in rules:
+        if needle in text:
+            return rule
+    return None
+
 def classify_single_asset(rel: str) -> Dict[str, Optional[str]]:
     """
     Returns a dict with fields: path, category, subtype, card_id, locale, note
     Categories: card_art, thumbnail, ui, category_label, event_banner, equipment, site, other
     """
+    # shared icons repeat across every variant; hand out a copy so callers can't mutate the cache
+    return dict(_classify_single_asset(rel))
+
+@lru_cache(maxsize=16384)
+def _classify_single_asset(rel: str) -> Dict[str, Optional[str]]:
     p = rel.replace("\\", "/").lower()
+    rule = _first_rule(ASSET_RULES, p)
 
     # Site / branding
-    if "dokkan-info-logo" in p:
+    if rule == "logo":
         return {"path": rel, "category": "site", "subtype": "logo", "card_id": None, "locale": None, "note": "DokkanInfo branding"}
     if "/venatus" in p or "ad" in p and "/image/" in p:
         return {"path": rel, "category": "site", "subtype": "ad", "card_id": None, "locale": None, "note": "Ad asset"}
 
     # UI elements
-    if "cha_rare_sm_" in p or "cha_rare_" in p:
-        return {"path": rel, "category": "ui", "subtype": "rarity_icon", "card_id": None, "locale": None, "note": None}
-    if "/cha_type_icon_" in p:
-        return {"path": rel, "category": "ui", "subtype": "type_icon", "card_id": None, "locale": None, "note": None}
-    if "/character_thumb_bg/" in p:
-        return {"path": rel, "category": "ui", "subtype": "thumb_bg", "card_id": None, "locale": None, "note": None}
-    if "/ingame/battle/skill_dialog/" in p:
-        return {"path": rel, "category": "ui", "subtype": "passive_mark", "card_id": None, "locale": None, "note": None}
-    if "/ingame/common/condition/st_" in p:
-        return {"path": rel, "category": "ui", "subtype": "condition_icon", "card_id": None, "locale": None, "note": None}
-    if "/charamenu/dokkan/" in p:
-        return {"path": rel, "category": "ui", "subtype": "menu_icon", "card_id": None, "locale": None, "note": None}
+    if rule in UI_ASSET_RULES:
+        return {"path": rel, "category": "ui", "subtype": rule, "card_id": None, "locale": None, "note": None}
 
     # Category chips
-    if "/card_category/label/" in p:
-        lab = re.search(r"card_category_label_(\d+)_", p)
+    if rule == "category_label":
+        lab = CATEGORY_LABEL_RE.search(p)
         return {"path": rel, "category": "category_label", "subtype": lab.group(1) if lab else None, "card_id": None, "locale": _extract_locale_from_rel(rel), "note": None}
 
     # Event banners
-    if "/ingame/events/" in p:
+    if rule == "event_banner":
         return {"path": rel, "category": "event_banner", "subtype": "zbattle" if "zbattle" in p else "event", "card_id": None, "locale": _extract_locale_from_rel(rel), "note": None}
 
     # Equipment
-    if "/item/equipment/" in p or "/layout/en/image/item/equipment/" in p:
+    if rule == "equipment":
         st = "item" if "/equ_item_" in p else "thumb_bg"
         return {"path": rel, "category": "equipment", "subtype": st, "card_id": None, "locale": _extract_locale_from_rel(rel), "note": None}
 
     # Thumbnails
-    if "/character/thumb/" in p:
+    if rule == "thumbnail":
         cid = _extract_card_id_from_rel(rel)
         return {"path": rel, "category": "thumbnail", "subtype": "card_thumb", "card_id": cid, "locale": _extract_locale_from_rel(rel), "note": None}
 
     # Card art (primary target)
-    if "/character/card/" in p:
+    if rule == "card_art":
         cid = _extract_card_id_from_rel(rel)
         loc = _extract_locale_from_rel(rel)
         file = p.rsplit("/", 1)[-1]
-        subtype = None
-        note = None
         if cid and file == f"{cid}.png":
             subtype = "full_card"
-        elif "_bg." in file:
-            subtype = "bg"
-        elif "_character." in file:
-            subtype = "character"
-        elif "_circle." in file:
-            subtype = "circle"
-        elif "_effect." in file:
-            subtype = "effect"
-        elif "cutin" in file:
-            subtype = "cutin"
-        elif "_sp02_name." in file:
-            subtype = "super_name_alt"
-        elif "_sp02_phrase." in file:
-            subtype = "super_phrase_alt"
-        elif "_sp_name." in file:
-            subtype = "super_name"
-        elif "_sp_phrase." in file:
-            subtype = "super_phrase"
         else:
-            subtype = "card_asset"
-        return {"path": rel, "category": "card_art", "subtype": subtype, "card_id": cid, "locale": loc, "note": note}
+            subtype = _first_rule(CARD_ART_SUBTYPES, file) or "card_asset"
+        return {"path": rel, "category": "card_art", "subtype": subtype, "card_id": cid, "locale": loc, "note": None}
 
     # Fallback
     return {"path": rel, "category": "other", "subtype": None, "card_id": _extract_card_id_from_rel(rel), "locale": _extract_locale_from_rel(rel), "note": None}
@@ -1373,21 +1748,12 @@ def merge_assets_index(dst: Dict[str, List[dict]], src: Dict[str, List[dict]]) -
     return dst
 
 # ------------ Scraping core (builds a single variant dict) -------------
-def _prune_assets_index(idx: dict) -> dict:
-    if not idx: return {}
-    out = {}
-    for cat, items in idx.items():
-        if cat not in KEEP_ASSET_CATEGORIES:
-            continue
-        kept = []
-        for it in items:
-            loc = (it.get("locale") or "en").lower()
-            if KEEP_ASSET_LOCALES and loc not in KEEP_ASSET_LOCALES:
-                continue
-            kept.append(it)
-        if kept:
-            out[cat] = kept
-    return out
+SUPER_BLOCK_RE = re.compile(r"Super Attack\s+([\s\S]*?)\s+Ultra Super Attack", re.IGNORECASE)
+ULTRA_BLOCK_RE = re.compile(
+    r"Ultra Super Attack\s+([\s\S]*?)\s+(Passive Skill|Active Skill|Link Skills|Categories|Stats|Transformation Condition\(s\))",
+    re.IGNORECASE,
+)
+
 def _prune_assets_index(idx: dict) -> dict:
     if not idx: return {}
     out = {}
@@ -1404,20 +1770,27 @@ def _prune_assets_index(idx: dict) -> dict:
             out[cat] = kept
     return out
 
-def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, object]) -> Tuple[Dict[str, object], Dict[str, object]]:
+def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, object],
+                             soup: Optional[BeautifulSoup] = None, tree=None) -> Tuple[Dict[str, object], Dict[str, object]]:
     """
     Returns (unit_level_fields, variant_record)
     unit_level_fields carries display_name/rarity/type/source_base_url + union assets (+ assets_index)
     variant_record is a single item for variants[]
+    Pass `soup`/`tree` when the caller already parsed page_html.
     """
-    soup = BeautifulSoup(page_html, "lxml")
+    if soup is None:
+        soup = _soup(page_html)
+    if tree is None:
+        tree = parse_html(page_html)
 
     # NEW: scope text to the correct variant side (base vs EZA)
     req_eza_flag = bool(variant.get("eza"))
-    base_text_scope, eza_text_scope = _text_before_after_step_scope(soup)
-    page_text = (eza_text_scope if req_eza_flag else base_text_scope) or soup.get_text("\n", strip=True)
+    base_text_scope, eza_text_scope = _text_before_after_step_scope(tree)
+    # the fallback reads the full lxml tree: the strained soup lacks body-level text and unlisted tags
+    page_text = (eza_text_scope if req_eza_flag else base_text_scope) or (_el_text(tree, "\n", strip=True) if tree is not None else "")
 
     # Parse headers from the scoped text only (prevents EZA blocks overriding base)
+    page_text_low = page_text.lower()
     sections = _split_sections(page_text)
 
     leader_skill = _clean_leader(sections.get("Leader Skill") or [])
@@ -1425,7 +1798,7 @@ def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, o
     ultra_name, ultra_effect = _clean_super_like(sections.get("Ultra Super Attack") or [])
 
     if not super_name:
-        mS = re.search(r"Super Attack\s+([\s\S]*?)\s+Ultra Super Attack", page_text, flags=re.IGNORECASE)
+        mS = _ci_search(SUPER_BLOCK_RE, page_text, page_text_low, "super attack")
         if mS:
             block = [ln.strip() for ln in mS.group(1).splitlines() if ln.strip()]
             sn, se = _clean_super_like(block)
@@ -1433,18 +1806,14 @@ def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, o
             super_effect = super_effect or se
 
     if not ultra_name:
-        mU = re.search(
-            r"Ultra Super Attack\s+([\s\S]*?)\s+(Passive Skill|Active Skill|Link Skills|Categories|Stats|Transformation Condition\(s\))",
-            page_text,
-            flags=re.IGNORECASE,
-        )
+        mU = _ci_search(ULTRA_BLOCK_RE, page_text, page_text_low, "ultra super attack")
         if mU:
             block = [ln.strip() for ln in mU.group(1).splitlines() if ln.strip()]
             un, ue = _clean_super_like(block)
             ultra_name = ultra_name or un
             ultra_effect = ultra_effect or ue
 
-    passive_lines, _ = parse_passive_lines_from_dom(soup)
+    passive_lines, _ = parse_passive_lines_from_dom(tree)
     passive_marked = render_passive_effect_with_markers(passive_lines)
     if not passive_lines and (sections.get("Passive Skill") or []):
         passive_block = sections.get("Passive Skill") or []
@@ -1460,38 +1829,30 @@ def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, o
     link_skills = _clean_links(sections.get("Link Skills") or [])
 
     # Categories (names) for compatibility, plus detailed for index
-    categories = parse_categories_from_soup(soup)
-    categories_detailed = parse_categories_detailed(soup, page_url)
+    categories = parse_categories_from_tree(tree)
+    categories_detailed = parse_categories_detailed(tree, page_url)
 
-    stats_textual = _parse_stats_textual(sections.get("Stats") or [], page_text)
+    stats_textual = _parse_stats_textual(sections.get("Stats") or [], page_text, page_text_low)
     stats_dom = _parse_stats_table_dom(soup)
     stats = {**stats_textual, **stats_dom}
 
-    rel_dt_dom, rel_tz_dom, eza_rel_dom = _parse_release_dom(soup)
+    b_index = _index_b_nodes(tree)
+    rel_dt_dom, rel_tz_dom, eza_rel_dom = _parse_release_dom(tree, b_index)
     if rel_dt_dom:
         release_date, tz = rel_dt_dom, rel_tz_dom
     else:
-        release_date, tz = _parse_release(page_text)
+        release_date, tz = _parse_release(page_text, page_text_low)
 
     # Collect and download images (we still download all images on page)
-    image_urls = []
-    seen = set()
-    for img in soup.find_all("img"):
-        src = img.get("src")
-        if not src:
-            continue
-        absu = urljoin(page_url, src)
-        if absu not in seen:
-            seen.add(absu)
-            image_urls.append(absu)
+    image_urls = list(dict.fromkeys(urljoin(page_url, src) for src in tree.xpath("//img/@src", smart_strings=False) if src))
     assets_rel_paths = download_assets_for_card(image_urls)
     assets_index = build_assets_index(assets_rel_paths)
     assets_index = _prune_assets_index(assets_index)
 
-    rarity = detect_rarity_from_dom(soup, image_urls)
+    rarity = detect_rarity_from_dom(tree, image_urls)
     type_token = detect_type_token_from_dom(soup)
     type_token_upper = type_token.upper() if type_token else None
-    awak = parse_awaken_links_from_soup(soup, rarity_hint=rarity)
+    awak = parse_awaken_links_from_tree(tree, rarity_hint=rarity)
 
     h1 = soup.select_one("h1")
     base_display_name = (
@@ -1502,9 +1863,9 @@ def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, o
 
     char_id = extract_character_id_from_url(page_url)
 
-    domains = parse_domains(soup)
-    standby_skill = parse_standby_skill(soup)
-    finish_skills = parse_finish_skills(soup)
+    domains = parse_domains(tree, b_index)
+    standby_skill = parse_standby_skill(tree, b_index)
+    finish_skills = parse_finish_skills(tree, b_index)
 
     # ---- unit-level fields ----
     unit_fields = {
@@ -1528,7 +1889,7 @@ def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, o
         "release_date": release_date,
         "timezone": tz,
         "eza_release_date": eza_rel_dom,
-        "obtain_type": parse_obtain_type(soup),
+        "obtain_type": parse_obtain_type(tree),
         "awakening": {"from_ids": awak["from"], "to_ids": awak["to"]},
         "rarity_rank": _rarity_rank(rarity),
         "kit": {
@@ -1562,16 +1923,50 @@ def scrape_variant_from_html(page_html: str, page_url: str, variant: Dict[str, o
 
 # ------------ Single-folder write/merge -------------
 
-def merge_variant_into_unit_json(folder: Path, unit_fields: Dict[str, object], variant_record: Dict[str, object]) -> Dict[str, object]:
+def _variant_log_path(folder: Path) -> Path:
+    # append-only journal of the variants merged into folder since its METADATA.json was last written
+    return VARIANT_LOGS_DIR / (folder.name + ".jsonl")
+
+def append_variant_line(folder: Path, unit_fields: Dict[str, object], variant_record: Dict[str, object]) -> None:
+    log_path = _variant_log_path(folder)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as f:
+        f.write(_dump_json_line({"unit": unit_fields, "variant": variant_record}))
+
+def _load_unit_json(folder: Path) -> Dict[str, object]:
+    """METADATA.json for folder plus any variants still sitting in its journal (a family cut short)."""
     meta_path = folder / "METADATA.json"
     if meta_path.exists():
         try:
-            current = json.loads(meta_path.read_text(encoding="utf-8"))
+            current = load_json_file(meta_path)
         except Exception:
             current = {}
     else:
         current = {}
 
+    log_path = _variant_log_path(folder)
+    if log_path.exists():
+        by_key = _variant_positions(current)
+        with open(log_path, "rb") as f:
+            for line in f:
+                try:
+                    rec = _load_json_line(line)
+                except ValueError:
+                    break   # torn tail from a crash mid-append
+                current = _merge_unit(current, rec.get("unit") or {}, rec.get("variant") or {}, by_key)
+    return current
+
+def _variant_positions(current: Dict[str, object]) -> Dict[str, int]:
+    # variant key -> index in current["variants"]; first occurrence wins if an old file has duplicates
+    by_key: Dict[str, int] = {}
+    for i, v in enumerate(current.get("variants") or []):
+        by_key.setdefault(v.get("key"), i)
+    return by_key
+
+def _merge_unit(current: Dict[str, object], unit_fields: Dict[str, object],
+                variant_record: Dict[str, object], by_key: Optional[Dict[str, int]] = None) -> Dict[str, object]:
+    """Fold one variant into current (seeding it if empty). by_key comes from _variant_positions()
+    and is kept up to date, so callers merging many variants can reuse it."""
     # seed structure
     if not current:
         current = {
@@ -1591,16 +1986,8 @@ def merge_variant_into_unit_json(folder: Path, unit_fields: Dict[str, object], v
         if not current.get(k) and unit_fields.get(k):
             current[k] = unit_fields[k]
 
-    # union assets (list)
-    def _union(a: List[str], b: List[str]) -> List[str]:
-        seen = set(a or [])
-        out = list(a or [])
-        for x in b or []:
-            if x not in seen:
-                seen.add(x); out.append(x)
-        return out
-
-    current["assets"] = _union(current.get("assets") or [], unit_fields.get("assets") or [])
+    # union assets (list), first-seen order
+    current["assets"] = list(dict.fromkeys([*(current.get("assets") or []), *(unit_fields.get("assets") or [])]))
 
     # union assets_index (dict of lists)
     current["assets_index"] = merge_assets_index(current.get("assets_index") or {}, unit_fields.get("assets_index") or {})
@@ -1608,30 +1995,28 @@ def merge_variant_into_unit_json(folder: Path, unit_fields: Dict[str, object], v
     # upsert variant by key
     key = variant_record.get("key")
     variants: List[dict] = current.get("variants") or []
-    replaced = False
-    for i, v in enumerate(variants):
-        if v.get("key") == key:
-            variants[i] = variant_record
-            replaced = True
-            break
-    if not replaced:
+    if by_key is None:
+        by_key = _variant_positions(current)
+    pos = by_key.get(key)
+    if pos is not None:
+        variants[pos] = variant_record
+    else:
+        by_key[key] = len(variants)
         variants.append(variant_record)
     current["variants"] = variants
+    return current
 
+def _annotate_awakening(current: Dict[str, object]) -> None:
     # ---------------------------
     # C) Annotate awakening chains & "fully awakened"
     # ---------------------------
 
-    # Local rarity mapping + helper for robustness
-    RARITY_RANK = {"N": 0, "R": 1, "SR": 2, "SSR": 3, "UR": 4, "LR": 5}
-
     def _rarity_rank_of_variant(v: dict) -> int:
         # Prefer explicit rarity_rank if you stored it during scrape (step B)
         if isinstance(v.get("rarity_rank"), int):
             return v["rarity_rank"]
         # Fallback to textual rarity field
-        r = (v.get("rarity") or "").upper()
-        return RARITY_RANK.get(r, -1)
+        return _rarity_rank(v.get("rarity"))
 
     # Normalize awakening fields on all variants
     variants = current.get("variants") or []
@@ -1661,28 +2046,46 @@ def merge_variant_into_unit_json(folder: Path, unit_fields: Dict[str, object], v
         internal = [i for i in ids if i in var_by_id]
         return internal if internal else ids
 
+    # Choose best candidate by rarity, then numeric id
+    def _key(nid: str):
+        v = var_by_id.get(nid)
+        rr = _rarity_rank_of_variant(v) if v else -1
+        try:
+            num = int(nid)
+        except Exception:
+            num = -1
+        return (rr, num)
+
+    # Each form's chosen next step and resolved head, shared by every variant's walk
+    next_cache: Dict[str, Optional[str]] = {}
+    head_cache: Dict[str, str] = {}
+
+    def _best_next(fid: str) -> Optional[str]:
+        if fid not in next_cache:
+            nxts = _next_ids(fid)
+            next_cache[fid] = max(nxts, key=_key) if nxts else None
+        return next_cache[fid]
+
     def _chain_head(fid: str) -> str:
         """Follow 'to' links until terminal; on forks, choose highest rarity then highest id."""
         seen: set[str] = set()
+        path: List[str] = []
         cur = str(fid)
-        while True:
-            nxts = _next_ids(cur)
-            if not nxts:
-                return cur
-            # Choose best candidate by rarity, then numeric id
-            def _key(nid: str):
-                v = var_by_id.get(nid)
-                rr = _rarity_rank_of_variant(v) if v else -1
-                try:
-                    num = int(nid)
-                except Exception:
-                    num = -1
-                return (rr, num)
-            nxt = max(nxts, key=_key)
-            if nxt in seen:           # cycle guard
+        while cur not in head_cache:
+            nxt = _best_next(cur)
+            if nxt is None:
+                head_cache[cur] = cur
+                break
+            if nxt in seen:           # cycle guard; the answer depends on the start, so don't cache it
                 return cur
             seen.add(nxt)
+            path.append(cur)
             cur = nxt
+        # Only walks that reached a real terminal get here; every form on the way shares its head
+        head = head_cache[cur]
+        for n in path:
+            head_cache[n] = head
+        return head
 
     # Annotate each variant
     for v in variants:
@@ -1694,20 +2097,64 @@ def merge_variant_into_unit_json(folder: Path, unit_fields: Dict[str, object], v
 
     current["variants"] = variants
 
+def finalize_family(folder: Path, current: Dict[str, object]) -> None:
+    """Annotate awakening chains, write METADATA.json once, then drop the folder's variant journal."""
+    _annotate_awakening(current)
+    _write_json_atomic(folder / "METADATA.json", current)
+    try:
+        _variant_log_path(folder).unlink()
+    except FileNotFoundError:
+        pass
+
+def recover_variant_logs() -> int:
+    """Fold journals left by an interrupted run back into their METADATA.json; returns how many."""
+    if not VARIANT_LOGS_DIR.exists():
+        return 0
+    recovered = 0
+    for log_path in VARIANT_LOGS_DIR.glob("*.jsonl"):
+        folder = OUTROOT / log_path.stem
+        finalize_family(folder, _load_unit_json(folder))
+        recovered += 1
+    return recovered
+
+def merge_variant_into_unit_json(folder: Path, unit_fields: Dict[str, object], variant_record: Dict[str, object],
+                                 cat_index: Optional[Dict[str, dict]] = None,
+                                 family_state: Optional[Dict[Path, Tuple[dict, Dict[str, int]]]] = None
+                                 ) -> Dict[str, object]:
+    """Merge one variant into folder's unit JSON. With family_state (folder -> (unit dict, variant
+    positions), owned by the caller) the merge stays in memory and is only journalled;
+    finalize_family() writes METADATA.json when the family is done. Without it, METADATA.json is
+    rewritten right away."""
+    if family_state is None:
+        current = _merge_unit(_load_unit_json(folder), unit_fields, variant_record)
+    else:
+        current, by_key = family_state.get(folder) or (None, None)
+        if current is None:
+            current = _load_unit_json(folder)
+            by_key = _variant_positions(current)
+        current = _merge_unit(current, unit_fields, variant_record, by_key)
+        family_state[folder] = (current, by_key)
+        append_variant_line(folder, unit_fields, variant_record)
+
     # ---------------------------
     # NEW: Update global CATEGORIES_INDEX.json from this variant's detailed categories
     # ---------------------------
     try:
         cat_items = (variant_record.get("kit") or {}).get("categories_detailed") or []
         if cat_items:
-            cat_index = load_category_index()
+            # main() passes its in-memory index (flushed in batches); standalone callers load/save here
+            own_index = cat_index is None
+            if own_index:
+                cat_index = load_category_index()
             for it in cat_items:
                 _index_add_category_item(cat_index, it)
-            save_category_index(cat_index)
+            if own_index:
+                save_category_index(cat_index)
     except Exception as e:
         logging.warning("Failed to update category index: %s", e)
 
-    meta_path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+    if family_state is None:
+        finalize_family(folder, current)
     return current
 
 def ensure_unit_folder(unit_fields: Dict[str, object]) -> Path:
@@ -1748,11 +2195,15 @@ def main():
     ASSETS_ROOT.mkdir(parents=True, exist_ok=True)
 
     index = load_index()
+    cat_index = load_category_index()
+    recovered = recover_variant_logs()
+    if recovered:
+        logging.info("Recovered %d unfinished unit folder(s) from variant journals", recovered)
     existing_ids = collect_existing_unit_ids(OUTROOT, index)
     if existing_ids:
         logging.info("Existing unit families detected: %d", len(existing_ids))
 
-    with sync_playwright() as p:
+    with sync_playwright() as p, _flush_on_exit(index, cat_index, existing_ids), ExitStack() as cleanup:
         browser = p.chromium.launch(headless=False)
         context = browser.new_context(
             user_agent=USER_AGENT,
@@ -1761,16 +2212,32 @@ def main():
         )
         page = context.new_page()
 
+        # Family workers each own a page; index crawling stays on the main thread's page
+        tls = threading.local()
+        state_lock = threading.RLock()   # index / cat_index / METADATA merges / processed sets
+
+        def current_page():
+            return getattr(tls, "page", page)
+
+        def parsed_page(html: str) -> Tuple[BeautifulSoup, object]:
+            """(soup, tree) for html, keeping the last page per thread: an EZA probe page that the
+            step scrape then loads again unchanged is only parsed once."""
+            cached = getattr(tls, "parsed", None)
+            if cached is None or cached[0] != html:
+                cached = tls.parsed = (html, _soup(html), parse_html(html))
+            return cached[1], cached[2]
+
         def goto_ok(url: str):
             """Navigate and return (ok_flag, html_or_none, final_url_str)."""
+            pg = current_page()
             try:
-                resp = page.goto(url, wait_until="domcontentloaded", timeout=TIMEOUT)
+                resp = pg.goto(url, wait_until="domcontentloaded", timeout=TIMEOUT)
                 ok = bool(resp and resp.ok)
                 if not ok and resp:
                     logging.warning("Non-OK response %s for %s", resp.status, url)
-                page.wait_for_timeout(700)
-                html = page.content()
-                return ok, html, page.url
+                pg.wait_for_timeout(700)
+                html = pg.content()
+                return ok, html, pg.url
             except PWTimeoutError as e:
                 logging.warning("Load timeout for %s -> %s", url, e)
                 return False, None, None
@@ -1784,10 +2251,11 @@ def main():
             Some pages render in EZA mode by default regardless of ?eza=false.
             If the PRE-EZA/EZA toggle exists, click PRE-EZA and let DOM settle.
             """
+            pg = current_page()
             try:
-                if page.locator("div.multiselect").count() > 0 and page.locator("b", has_text="PRE-EZA").count() > 0:
-                    page.locator("b", has_text="PRE-EZA").first.click()
-                    page.wait_for_timeout(500)
+                if pg.locator("div.multiselect").count() > 0 and pg.locator("b", has_text="PRE-EZA").count() > 0:
+                    pg.locator("b", has_text="PRE-EZA").first.click()
+                    pg.wait_for_timeout(500)
             except Exception as e:
                 logging.debug("ensure_pre_eza_mode() no-op: %s", e)
 
@@ -1796,26 +2264,30 @@ def main():
                                force_folder: Optional[Path] = None,
                                variant_key_override: Optional[str] = None,
                                family_base_id: Optional[str] = None,
-                               eza_max_step_hint: Optional[int] = None) -> Tuple[Optional[str], Optional[str], Optional[Path], bool, Optional[str]]:
-            """Scrape a single page into a variant record and merge (optionally into an existing folder)."""
+                               eza_max_step_hint: Optional[int] = None) -> Tuple[Optional[str], Optional[str], Optional[Path], bool, Optional[BeautifulSoup], object]:
+            """
+            Scrape a single page into a variant record and merge (optionally into an existing folder).
+            Returns (form_id, rarity, folder, ok, soup, tree); the parsed page is handed back so callers don't reparse it.
+            """
             req_eza_flag, req_step_i = parse_variant_from_url(url)
             ok, html, final_url = goto_ok(url)
             if not ok or not html:
-                return None, None, None, False, None
+                return None, None, None, False, None, None
 
             # NEW: If this is the base variant, force UI into PRE-EZA and re-capture HTML
             if not req_eza_flag:
                 ensure_pre_eza_mode()
                 try:
-                    html = page.content()
+                    html = current_page().content()
                 except Exception:
                     pass
 
+            soup, tree = parsed_page(html)
             unit_fields, variant_record = scrape_variant_from_html(html, final_url or url, variant={
                 "key": build_variant_key(req_eza_flag, req_step_i),
                 "eza": req_eza_flag,
                 "step": req_step_i,
-            })
+            }, soup=soup, tree=tree)
 
             # override key for transformation/foreign forms if needed
             if variant_key_override:
@@ -1843,22 +2315,24 @@ def main():
                 # mark only that final step as the Super step
                 variant_record["is_super_eza"] = (variant_record["step"] == eza_max_step_hint and eza_max_step_hint in (4, 8))
 
-            # folder + merge
-            folder = force_folder or ensure_unit_folder(unit_fields)
-            merged = merge_variant_into_unit_json(folder, unit_fields, variant_record)
-
-            # update index (per form id)
-            index_add_variant(index,
-                              unit_fields.get("unit_id") or "unknown",
-                              folder,
-                              unit_fields.get("display_name") or merged.get("display_name") or "Unknown",
-                              unit_fields.get("rarity") or merged.get("rarity"),
-                              unit_fields.get("type") or merged.get("type"),
-                              variant_record.get("key"))
+            with state_lock:
+                # folder + merge
+                folder = force_folder or ensure_unit_folder(unit_fields)
+                merged = merge_variant_into_unit_json(folder, unit_fields, variant_record, cat_index,
+                                                      getattr(tls, "family_state", None))
+
+                # update index (per form id)
+                index_add_variant(index,
+                                  unit_fields.get("unit_id") or "unknown",
+                                  folder,
+                                  unit_fields.get("display_name") or merged.get("display_name") or "Unknown",
+                                  unit_fields.get("rarity") or merged.get("rarity"),
+                                  unit_fields.get("type") or merged.get("type"),
+                                  variant_record.get("key"))
 
             logging.info("Saved %s (%s) -> %s",
                          unit_fields.get("unit_id"), variant_record.get("key"), folder)
-            return unit_fields.get("unit_id"), merged.get("rarity") or unit_fields.get("rarity"), folder, True, html
+            return unit_fields.get("unit_id"), merged.get("rarity") or unit_fields.get("rarity"), folder, True, soup, tree
 
         # -------- canonical neighbor resolution + discovery --------
         def _extract_card_int_id(url: str) -> Optional[int]:
@@ -1897,15 +2371,15 @@ def main():
                 if not ok1 or not html1:
                     continue
 
-                soup1 = BeautifulSoup(html1, "lxml")
+                soup1, tree1 = parsed_page(html1)
 
                 # HARD EVIDENCE gate
-                if not has_eza_evidence(soup1):
+                if not has_eza_evidence(soup1, tree1):
                     logging.info("No EZA evidence found for %s (skipping EZA).", cand)
                     continue
 
                 # Safe step discovery
-                steps = discover_eza_steps_safe(soup1, rarity_hint=rarity_hint)
+                steps = discover_eza_steps_safe(soup1, tree1, rarity_hint=rarity_hint)
                 if steps:
                     if cand != base_clean_url:
                         logging.info("Canonical base for form resolved to %s (from %s)", cand, base_clean_url)
@@ -1915,31 +2389,22 @@ def main():
             logging.info("No EZA found for %s", base_clean_url)
             return base_clean_url, []
 
-        def has_eza_stats_headers(soup: BeautifulSoup) -> bool:
-            """True if the Stats table shows EZA columns."""
-            for th in soup.find_all("th"):
-                txt = (th.get_text(" ", strip=True) or "").upper()
-                # Typical headers we already map in _parse_stats_table_dom
-                if "EZA" in txt or "EZA B." in txt or "EZA 100%" in txt:
-                    return True
-            return False
-
-        def has_eza_release_block(soup: BeautifulSoup) -> bool:
+        def has_eza_release_block(tree) -> bool:
             """True if the page exposes an 'EZA Release Date' block."""
-            _, _, eza_rel_dt = _parse_release_dom(soup)
+            _, _, eza_rel_dt = _parse_release_dom(tree)
             return bool(eza_rel_dt)
 
-        def has_eza_evidence(soup: BeautifulSoup) -> bool:
+        def has_eza_evidence(soup: BeautifulSoup, tree) -> bool:
             """Final gate: we only consider EZA if there is hard evidence on the page."""
-            return has_eza_release_block(soup) or has_eza_stats_headers(soup)
+            return has_eza_release_block(tree) or has_eza_stats_headers(soup)
 
-        def discover_eza_steps_safe(soup: BeautifulSoup, rarity_hint: Optional[str]) -> List[int]:
+        def discover_eza_steps_safe(soup: BeautifulSoup, tree, rarity_hint: Optional[str]) -> List[int]:
             """
             Read the EZA step dropdown ONLY if we have EZA evidence.
             Backfill 1..max. If there's only a single visible value, respect rarity_hint
             to extend to the expected cap (UR=8, LR=4).
             """
-            if not has_eza_evidence(soup):
+            if not has_eza_evidence(soup, tree):
                 return []
 
             steps = discover_eza_steps_from_dropdown(soup)
@@ -1960,7 +2425,7 @@ def main():
 
             return []
 
-        def discover_family_ids_bfs(start_html: Optional[str], start_id: str) -> List[str]:
+        def discover_family_ids_bfs(start_tree, start_id: str) -> List[str]:
             """
             BFS across the 'tile strip' so we don't miss transformations/variations shown only on sub-pages.
             """
@@ -1968,9 +2433,9 @@ def main():
             queue: List[str] = []
             seen_pages: Set[str] = set()
 
-            # seed from start_html if available
-            if start_html:
-                for rid in extract_ids_from_col5_images(start_html):
+            # seed from the already-parsed start page if available
+            if start_tree is not None:
+                for rid in extract_ids_from_col5_images(start_tree):
                     if rid not in family:
                         family.add(rid)
                         queue.append(rid)
@@ -1984,7 +2449,7 @@ def main():
                 ok, html, fin = goto_ok(make_variant_url(url, eza=False, step=None))
                 if not ok or not html:
                     continue
-                more = extract_ids_from_col5_images(html)
+                more = extract_ids_from_col5_images_from_html(html)
                 for mid in more:
                     if mid not in family and len(family) < MAX_FAMILY_SIZE:
                         family.add(mid)
@@ -2001,42 +2466,43 @@ def main():
             """
             # If this base id already processed (as part of another family), skip
             base_id = extract_character_id_from_url(base_clean_url) or ""
-            if base_id in global_processed:
-                logging.info("Skipping %s; already processed in another family.", base_id)
-                return None, set(), None
+            with state_lock:
+                if base_id in global_processed:
+                    logging.info("Skipping %s; already processed in another family.", base_id)
+                    return None, set(), None
 
-            # NEW: hard skip if we've already scraped this family on disk or index
-            if SKIP_EXISTING and base_id in existing_ids:
-                logging.info("Skipping %s; already exists in index/disk.", base_id)
+                # NEW: hard skip if we've already scraped this family on disk or index
+                if SKIP_EXISTING and base_id in existing_ids:
+                    logging.info("Skipping %s; already exists in index/disk.", base_id)
+                    global_processed.add(base_id)
+                    return None, set(), None
+
+                # claim it so a concurrent worker doesn't start the same family
                 global_processed.add(base_id)
-                return None, set(), None
 
             # 1) base first
             base_url = make_variant_url(base_clean_url, eza=False, step=None)
-            cid, rarity, folder, ok, html_base = scrape_one_variant(base_url, rarity_hint=None, family_base_id=None)
+            cid, rarity, folder, ok, soup_base, tree_base = scrape_one_variant(base_url, rarity_hint=None, family_base_id=None)
             if not cid or not folder:
                 return None, set(), None
 
             # Track as existing now to avoid repeats later in the crawl
-            existing_ids.add(cid)
+            with state_lock:
+                existing_ids.add(cid)
+                global_processed.add(cid)
 
             # Mark base as processed
             processed_ids: Set[str] = {cid}
 
             # 2) EZA steps (UI-driven) — write into same folder
-            soup_base = BeautifulSoup(html_base, "lxml") if html_base else None
             steps, eza_max_step = discover_eza_steps_on_page_soup(soup_base, rarity_hint=rarity)
 
             # If the PRE-EZA/EZA toggle exists but steps weren't parsed, open the same card with eza=true to read the dropdown
             if (not steps) and soup_base:
-                has_toggle = bool(
-                    soup_base.find("b", string=lambda s: isinstance(s, str) and s.strip().upper() == "PRE-EZA") and
-                    soup_base.find("b", string=lambda s: isinstance(s, str) and s.strip().upper() == "EZA")
-                )
-                if has_toggle:
+                if has_eza_toggle(soup_base):
                     ok_eza, html_eza, _ = goto_ok(make_variant_url(base_clean_url, eza=True, step=1))
                     if ok_eza and html_eza:
-                        steps, eza_max_step = discover_eza_steps_on_page_soup(BeautifulSoup(html_eza, "lxml"), rarity_hint=rarity)
+                        steps, eza_max_step = discover_eza_steps_on_page_soup(parsed_page(html_eza)[0], rarity_hint=rarity)
 
             for st in steps:
                 step_url = make_variant_url(base_clean_url, eza=True, step=st)
@@ -2045,7 +2511,7 @@ def main():
                 time.sleep(SLEEP_BETWEEN_CARDS)
 
             # 3) Family discovery (transformations/variations)
-            family_ids = discover_family_ids_bfs(html_base, cid)
+            family_ids = discover_family_ids_bfs(tree_base, cid)
 
             # Scrape each related id (including base again in list, but we skip it)
             for rid in family_ids:
@@ -2053,10 +2519,14 @@ def main():
                     continue
                 if rid in processed_ids:
                     continue
+                # a form this family reaches can't be started as another family's base (as in a serial run);
+                # it is still scraped into this family's folder even if another family has it too
+                with state_lock:
+                    global_processed.add(rid)
                 related_base = normalize_to_base_url(f"{BASE}/cards/{rid}")
 
                 # related base (as variant)
-                rcid, rrarity, _, rok, rhtml = scrape_one_variant(
+                rcid, rrarity, _, rok, soup_rel, _ = scrape_one_variant(
                     make_variant_url(related_base, eza=False, step=None),
                     rarity_hint=None,
                     force_folder=folder,
@@ -2067,19 +2537,14 @@ def main():
                     processed_ids.add(rcid)
 
                 # EZA steps for related (UI-driven)
-                soup_rel = BeautifulSoup(rhtml, "lxml") if rhtml else None
                 r_steps, r_eza_max_step = discover_eza_steps_on_page_soup(soup_rel, rarity_hint=rrarity)
 
                 # If toggle exists but no steps parsed, open related page with eza=true
                 if (not r_steps) and soup_rel:
-                    has_toggle_rel = bool(
-                        soup_rel.find("b", string=lambda s: isinstance(s, str) and s.strip().upper() == "PRE-EZA") and
-                        soup_rel.find("b", string=lambda s: isinstance(s, str) and s.strip().upper() == "EZA")
-                    )
-                    if has_toggle_rel:
+                    if has_eza_toggle(soup_rel):
                         ok_reza, html_reza, _ = goto_ok(make_variant_url(related_base, eza=True, step=1))
                         if ok_reza and html_reza:
-                            r_steps, r_eza_max_step = discover_eza_steps_on_page_soup(BeautifulSoup(html_reza, "lxml"), rarity_hint=rrarity)
+                            r_steps, r_eza_max_step = discover_eza_steps_on_page_soup(parsed_page(html_reza)[0], rarity_hint=rrarity)
 
                 for st in r_steps:
                     scrape_one_variant(
@@ -2093,32 +2558,137 @@ def main():
                     time.sleep(SLEEP_BETWEEN_CARDS)
 
             # mark all processed in global set so index-mode won't double-process
-            global_processed.update(processed_ids)
+            with state_lock:
+                global_processed.update(processed_ids)
             return cid, processed_ids, rarity
 
         # -------- Execution modes --------
         processed_global: Set[str] = set()
+        counts = {"families": 0, "bases": 0, "total": 0, "reserved": 0}
+        slot_free = threading.Condition(state_lock)   # a reserved MAX_NEW_CARDS slot was handed back
+        family_q: "queue.Queue[Optional[str]]" = queue.Queue()
+        stop = threading.Event()
+
+        limited = not SEED_URLS   # MAX_NEW_CARDS only applies to index crawling
+
+        def process_family(base_clean: str) -> None:
+            base_id = extract_character_id_from_url(base_clean) or ""
+
+            # Global skip for existing
+            if SKIP_EXISTING and base_id in existing_ids:
+                logging.info("Skip %s; already exists in index/disk.", base_id)
+                return
+
+            # Reserve a MAX_NEW_CARDS slot up front so in-flight families can't overshoot the limit;
+            # while all slots are reserved, wait for one to be handed back or for the stop
+            if limited:
+                with slot_free:
+                    while counts["reserved"] >= MAX_NEW_CARDS and not stop.is_set():
+                        slot_free.wait(timeout=0.5)
+                    if stop.is_set():
+                        return
+                    counts["reserved"] += 1
+
+            # variants merge into memory (journalled) and each folder's METADATA.json is written once, here
+            family_state: Dict[Path, Tuple[dict, Dict[str, int]]] = {}
+            tls.family_state = family_state
+            base_cid = None
+            try:
+                base_cid, processed_ids, rarity = scrape_all_variants_for_base(base_clean, processed_global)
+            finally:
+                tls.family_state = None
+                with state_lock:
+                    for folder, (current, _) in family_state.items():
+                        finalize_family(folder, current)
+                    if limited and not base_cid:
+                        counts["reserved"] -= 1   # nothing new was saved; hand the slot back
+                        slot_free.notify()
+
+            with state_lock:
+                counts["families"] += 1
+                if counts["families"] % FLUSH_EVERY_FAMILIES == 0:
+                    flush_index(index, cat_index, existing_ids)
+
+                # Update counters
+                if base_cid:
+                    counts["total"] += 1
+                    existing_ids.add(base_cid)
+                    if COUNT_MODE == "bases":
+                        counts["bases"] += 1
+
+                # stop conditions
+                if limited and not stop.is_set():
+                    if COUNT_MODE == "total" and counts["total"] >= MAX_NEW_CARDS:
+                        logging.info("Reached MAX_NEW_CARDS=%d (total). Stopping.", MAX_NEW_CARDS)
+                        stop.set()
+                    if COUNT_MODE == "bases" and counts["bases"] >= MAX_NEW_CARDS:
+                        logging.info("Reached MAX_NEW_CARDS=%d (bases). Stopping.", MAX_NEW_CARDS)
+                        stop.set()
+
+            time.sleep(SLEEP_BETWEEN_CARDS)
+
+        def family_worker() -> None:
+            """Pool worker: own Playwright/browser (sync API objects can't cross threads), drain family_q until None."""
+            with sync_playwright() as wp:
+                wbrowser = wp.chromium.launch(headless=False)
+                try:
+                    wcontext = wbrowser.new_context(
+                        user_agent=USER_AGENT,
+                        locale="en-US",
+                        viewport={"width": 1400, "height": 900},
+                    )
+                    tls.page = wcontext.new_page()
+                    while True:
+                        base_clean = family_q.get()
+                        try:
+                            if base_clean is None:
+                                return
+                            if not stop.is_set():
+                                process_family(base_clean)
+                        except Exception:
+                            logging.exception("Family failed: %s", base_clean)
+                        finally:
+                            family_q.task_done()
+                finally:
+                    wbrowser.close()
+
+        workers = max(1, FAMILY_WORKERS)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="family")
+        futures = [pool.submit(family_worker) for _ in range(workers)]
+
+        def stop_workers() -> None:
+            stop.set()
+            for _ in futures:
+                family_q.put(None)
+            pool.shutdown(wait=True)
+            for f in futures:
+                f.result()
+
+        cleanup.callback(stop_workers)
+
+        def run_families(base_urls: List[str]) -> None:
+            """Queue families for the worker pool and wait until they're all done."""
+            for base_clean in base_urls:
+                family_q.put(base_clean)
+            while family_q.unfinished_tasks:
+                if all(f.done() for f in futures):
+                    for f in futures:
+                        f.result()   # surfaces the worker's error
+                    raise RuntimeError("All family workers exited with families still queued")
+                time.sleep(0.5)
 
         if SEED_URLS:
             logging.info("Seed mode: %d URL(s) — base → dropdown steps; includes transformations.", len(SEED_URLS))
-            for base_any in SEED_URLS:
-                base_clean = normalize_to_base_url(base_any)
-                base_id_for_seed = extract_character_id_from_url(base_clean) or ""
-                if SKIP_EXISTING and base_id_for_seed in existing_ids:
-                    logging.info("Seed skip %s; already exists.", base_id_for_seed)
-                    continue
-                base_cid, family_ids, rarity = scrape_all_variants_for_base(base_clean, processed_global)
+            run_families([normalize_to_base_url(u) for u in SEED_URLS])
             browser.close()
             logging.info("Run completed. Log file: %s", log_path)
             return
 
         # -------- Index crawl mode --------
-        bases_saved = 0
-        total_saved = 0
         current_index_url = INDEX_URL
         pages_done = 0
 
-        while pages_done < MAX_PAGES:
+        while pages_done < MAX_PAGES and not stop.is_set():
             try:
                 logging.info("Opening index page: %s", current_index_url)
                 page.goto(current_index_url, wait_until="domcontentloaded", timeout=TIMEOUT)
@@ -2157,37 +2727,8 @@ def main():
 
             logging.info("Found %d card links on this page.", len(links))
 
-            for i, card_url in enumerate(links, start=1):
-                base_clean = normalize_to_base_url(card_url)
-                base_id = extract_character_id_from_url(base_clean) or ""
-
-                # Global skip for existing
-                if SKIP_EXISTING and base_id in existing_ids:
-                    logging.info("Index skip %s; already exists in index/disk.", base_id)
-                    continue
-
-                base_cid, processed_ids, rarity = scrape_all_variants_for_base(base_clean, processed_global)
-
-                # Update counters
-                if base_cid:
-                    total_saved += 1
-                    existing_ids.add(base_cid)
-                    if COUNT_MODE == "bases":
-                        bases_saved += 1
-
-                # stop conditions
-                if COUNT_MODE == "total" and total_saved >= MAX_NEW_CARDS:
-                    logging.info("Reached MAX_NEW_CARDS=%d (total). Stopping.", MAX_NEW_CARDS)
-                    browser.close()
-                    logging.info("Run completed. Log file: %s", log_path)
-                    return
-                if COUNT_MODE == "bases" and bases_saved >= MAX_NEW_CARDS:
-                    logging.info("Reached MAX_NEW_CARDS=%d (bases). Stopping.", MAX_NEW_CARDS)
-                    browser.close()
-                    logging.info("Run completed. Log file: %s", log_path)
-                    return
-
-                time.sleep(SLEEP_BETWEEN_CARDS)
+            # One page of families at a time across the worker pool
+            run_families([normalize_to_base_url(u) for u in links])
 
             next_url = build_next_index_url(current_index_url)
             if next_url == current_index_url: